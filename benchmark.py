@@ -0,0 +1,182 @@
+"""
+Headless benchmark of the engines and renderers.
+
+Runs every seed style without a window or the settings screen, each run in a
+process of its own so its peak memory is measured alone, and prints the
+results as JSON, e.g.
+
+    python benchmark.py --engines set,dense --renderers surfarray --sizes 480x270,960x540 -g 200
+"""
+
+import os
+
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'  # keep stdout clean for the JSON
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import sys
+import tracemalloc
+import pygame
+import main
+import engines
+import renderLife
+import ruleLife
+import seedLife
+import metrics
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def makeLife(args, engine, renderer, style, size):
+    cols, rows = size
+    life = main.Main()
+    life.scale = args.scale
+    life.popPercent = args.poppercent
+    life.workers = args.workers
+    life.rule = ruleLife.makeRule(args.rule)
+    life.topology = args.topology
+    life.xmax = cols * life.scale
+    life.ymax = rows * life.scale
+    life.screen = pygame.display.set_mode((life.xmax, life.ymax))
+    life.xborder = life.xmax // life.scale
+    life.yborder = life.ymax // life.scale
+    life.cols = life.xmax // life.scale
+    life.rows = life.ymax // life.scale
+    life.maxCell = [life.xmax, life.ymax]
+    for name in seedLife.styleList:
+        setattr(life, name, False)
+    setattr(life, style, True)
+    life.running = True
+    life.board = set([])
+    life.engine = engines.makeEngine(engine, life)
+    life.renderer = renderLife.makeRenderer(renderer, life)
+    return life
+
+
+def run(args, engine, renderer, style, size):
+    life = makeLife(args, engine, renderer, style, size)
+    life.randomSeed = args.seed
+    life.metrics = metrics.Metrics(max(args.generations, 1))
+    timer = life.metrics.timer
+    if args.trace_memory:
+        tracemalloc.start()
+
+    with timer('seed'):
+        life.seed()
+        life.board = life.iterate(life.board)
+        life.addColorEntropy(life.board)
+        life.renderer.invalidate()
+
+    population = 0
+    for count in range(args.generations):
+        with timer('draw'):
+            life.renderer.clear()
+            xs, ys = life.view(life.board)
+            life.renderer.draw(xs, ys, life.colors.colors(xs, ys))
+        with timer('decay'):
+            life.colors.decayCells(xs, ys, args.turbo)
+        with timer('iterate'):
+            life.board = life.iterate(life.board, args.turbo)
+        with timer('flip'):
+            life.renderer.present([])
+        life.metrics.endFrame(count, len(life.board))
+        population += len(life.board)
+    phases = life.metrics.totals
+
+    result = dict(engine=life.engine.name, renderer=renderer, style=style, size='{}x{}'.format(*size),
+                  rule=life.rule.text,
+                  topology=args.topology, turbo=args.turbo,
+                  scale=args.scale, seed=args.seed, generations=args.generations,
+                  finalPopulation=len(life.board), meanPopulation=population / max(args.generations, 1),
+                  phases=phases, percentiles=dict((name, life.metrics.percentiles(name)) for name in metrics.phaseList))
+    frames = phases['draw'] + phases['decay'] + phases['iterate'] + phases['flip']
+    generations = args.generations * args.turbo
+    result['framesPerSec'] = args.generations / frames if frames else None
+    result['gensPerSec'] = generations / frames if frames else None
+    result['iterGensPerSec'] = generations / phases['iterate'] if phases['iterate'] else None
+    result['cellsPerSec'] = size[0] * size[1] * generations / phases['iterate'] if phases['iterate'] else None
+    if args.trace_memory:
+        result['peakTracedBytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    life.engine.close()
+    return result
+
+
+def runChild(conn, args, engine, renderer, style, size):
+    # messages such as engine fallbacks go to stderr, stdout is kept for the JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        result = run(args, engine, renderer, style, size)
+    # ru_maxrss is KiB on Linux, the whole process is this one run
+    result['peakRssKiB'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    conn.send(result)
+    conn.close()
+
+
+def runIsolated(args, engine, renderer, style, size):
+    # each run in a fresh process so its peak memory is its own, where the
+    # platform can report it
+    if resource is None:
+        with contextlib.redirect_stdout(sys.stderr):
+            return run(args, engine, renderer, style, size)
+    ctx = multiprocessing.get_context('spawn')
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=runChild, args=(child, args, engine, renderer, style, size))
+    proc.start()
+    child.close()
+    try:
+        result = parent.recv()
+    except EOFError:
+        proc.join()
+        raise RuntimeError("benchmark run {} {} {} {}x{} exited with code {}".format(
+            engine, renderer, style, size[0], size[1], proc.exitcode))
+    proc.join()
+    return result
+
+
+def parseSize(text):
+    cols, rows = text.lower().split('x')
+    return int(cols), int(rows)
+
+
+def runAll():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--engines', default='set', help='comma separated, one of ' + ','.join(engines.engineList))
+    parser.add_argument('--renderers', default='surfarray',
+                        help='comma separated, one of ' + ','.join(renderLife.rendererList))
+    parser.add_argument('--styles', default=','.join(seedLife.styleList), help='comma separated seed styles')
+    parser.add_argument('--sizes', default='480x270', help='comma separated board sizes in cells, COLSxROWS')
+    parser.add_argument('--rule', default=ruleLife.conway, help='B/S notation, e.g. B36/S23')
+    parser.add_argument('--topology', default='clipped', choices=engines.topologyList)
+    parser.add_argument('--scale', type=int, default=2)
+    parser.add_argument('--poppercent', type=float, default=0.06)
+    parser.add_argument('--workers', type=int, default=0, help='tiled engine processes, 0 uses every core')
+    parser.add_argument('--seed', type=int, default=1, help='random seed')
+    parser.add_argument('-g', '--generations', type=int, default=100, help='displayed frames')
+    parser.add_argument('--turbo', type=int, default=1, help='generations per displayed frame')
+    parser.add_argument('--trace-memory', action='store_true', help='peak Python allocations (slows the run)')
+    parser.add_argument('-o', '--output', help='write the JSON here instead of stdout')
+    args = parser.parse_args()
+
+    results = []
+    for size in map(parseSize, args.sizes.split(',')):
+        for style in args.styles.split(','):
+            for engine in args.engines.split(','):
+                for renderer in args.renderers.split(','):
+                    results.append(runIsolated(args, engine, renderer, style, size))
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as out:
+            out.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    runAll()
@@ -0,0 +1,197 @@
+"""
+Checkpoints: the state of a run in one binary file, to resume it after a restart.
+
+A fixed size header is followed by the sections it describes, each 8 byte
+aligned: the live cells, either as a packed bitmap of their bounding box or
+as x, y pairs when those are smaller, the colour age grid, and the parked
+colours of an unbounded board. Everything is little endian so a file is read
+straight back with np.memmap, no parsing. Files are written to a temporary
+name and moved into place, so a crash mid write leaves the last one intact.
+"""
+
+import os
+import queue
+import threading
+import time
+import numpy as np
+import colorLife
+import engines
+
+magic = b'LIFECKPT'
+version = 1
+bitmap, pairs = 0, 1  # board layouts
+
+headerType = np.dtype([
+    ('magic', 'S8'), ('version', '<u4'), ('layout', '<u4'),
+    ('width', '<i8'), ('height', '<i8'),  # colour grid
+    ('count', '<i8'), ('viewX', '<i8'), ('viewY', '<i8'),
+    ('left', '<i8'), ('top', '<i8'), ('boardW', '<i8'), ('boardH', '<i8'),  # bounding box of the cells
+    ('cells', '<i8'), ('parked', '<i8'), ('pans', '<i8'), ('evicted', '<i8'),
+    ('topology', 'S16'), ('rule', 'S64'),
+])
+
+
+def sections(header):
+    # (name, dtype, shape, offset) of each array after the header
+    if header['layout'] == bitmap:
+        board = ('board', np.uint8, (int(header['boardH']), (int(header['boardW']) + 7) // 8))
+    else:
+        board = ('board', np.dtype('<i8'), (int(header['cells']), 2))
+    parked = int(header['parked'])
+    arrays = [board,
+              ('age', np.dtype('<u2'), (int(header['height']), int(header['width']))),
+              ('keys', np.dtype('<i8'), (parked,)),
+              ('stamp', np.dtype('<i8'), (parked,)),
+              ('ages', np.dtype('<u2'), (parked,))]
+    offset = headerType.itemsize
+    layout = []
+    for name, dtype, shape in arrays:
+        layout.append((name, dtype, shape, offset))
+        offset += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8
+    return layout
+
+
+class Checkpoint:
+    # Everything needed to carry on a run. The board may be given as an engine
+    # returned it, it is only turned into arrays when written.
+    def __init__(self, age, count, board=None, xs=None, ys=None, viewX=0, viewY=0, topology='clipped',
+                 rule='B3/S23', keys=None, stamp=None, ages=None, pans=0, evicted=0):
+        self.age = age
+        self.count = count
+        self.board = board
+        self.xs, self.ys = xs, ys
+        self.viewX, self.viewY = viewX, viewY
+        self.topology = topology
+        self.rule = rule
+        self.keys = np.zeros(0, dtype=np.int64) if keys is None else keys
+        self.stamp = np.zeros(0, dtype=np.int64) if stamp is None else stamp
+        self.ages = np.zeros(0, dtype=np.uint16) if ages is None else ages
+        self.pans = pans
+        self.evicted = evicted
+
+    def arrays(self):
+        if self.xs is None:
+            self.xs, self.ys = engines.boardArrays(self.board)
+        return self.xs, self.ys
+
+    def write(self, path):
+        xs, ys = self.arrays()
+        header = np.zeros(1, dtype=headerType)[0]
+        header['magic'], header['version'] = magic, version
+        header['height'], header['width'] = self.age.shape
+        header['count'], header['viewX'], header['viewY'] = self.count, self.viewX, self.viewY
+        header['cells'], header['parked'] = len(xs), len(self.keys)
+        header['pans'], header['evicted'] = self.pans, self.evicted
+        header['topology'], header['rule'] = self.topology.encode(), self.rule.encode()
+
+        # a bitmap of the bounding box unless the cells are too far apart for it to pay
+        board = np.stack((xs, ys), axis=1).astype('<i8')
+        header['layout'] = pairs
+        if len(xs):
+            left, top = int(xs.min()), int(ys.min())
+            w, h = int(xs.max()) - left + 1, int(ys.max()) - top + 1
+            header['left'], header['top'], header['boardW'], header['boardH'] = left, top, w, h
+            if h * ((w + 7) // 8) < board.nbytes:
+                grid = np.zeros((h, w), dtype=bool)
+                grid[ys - top, xs - left] = True
+                board = np.packbits(grid, axis=1)
+                header['layout'] = bitmap
+
+        data = {'board': board, 'age': self.age.astype('<u2'), 'keys': self.keys.astype('<i8'),
+                'stamp': self.stamp.astype('<i8'), 'ages': self.ages.astype('<u2')}
+        temp = path + '.tmp'
+        with open(temp, 'wb') as out:
+            out.write(header.tobytes())
+            for name, dtype, shape, offset in sections(header):
+                out.write(b'\0' * (offset - out.tell()))
+                out.write(np.ascontiguousarray(data[name]).tobytes())
+        os.replace(temp, path)
+
+    def restore(self, colors):
+        # put the saved colours back into a fresh store for the same board
+        colors.age[...] = self.age
+        if isinstance(colors, colorLife.WorldColorStore):
+            colors.keys, colors.stamp, colors.parked = self.keys, self.stamp, self.ages
+            colors.originX, colors.originY = self.viewX, self.viewY
+            colors.pans, colors.evicted = self.pans, self.evicted
+
+
+def mapped(path, dtype, shape, offset):
+    if int(np.prod(shape)) == 0:
+        return np.zeros(shape, dtype=dtype)  # mmap can't map an empty range
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+
+def load(path):
+    # Checkpoint from a file, the arrays are memory mapped and copied once so
+    # the file can be replaced while the run carries on
+    if os.path.getsize(path) < headerType.itemsize:
+        raise ValueError("too short for a checkpoint")
+    header = np.memmap(path, dtype=headerType, mode='r', shape=(1,))[0]
+    if header['magic'] != magic or header['version'] != version:
+        raise ValueError("not a version {} checkpoint".format(version))
+    arrays = {name: np.array(mapped(path, dtype, shape, offset)) for name, dtype, shape, offset in sections(header)}
+
+    if header['layout'] == bitmap:
+        grid = np.unpackbits(arrays['board'], axis=1, count=int(header['boardW']))
+        ys, xs = np.nonzero(grid)
+        xs, ys = xs + int(header['left']), ys + int(header['top'])
+    else:
+        xs, ys = arrays['board'][:, 0], arrays['board'][:, 1]
+    return Checkpoint(arrays['age'], int(header['count']), xs=xs.astype(np.int64), ys=ys.astype(np.int64),
+                      viewX=int(header['viewX']), viewY=int(header['viewY']),
+                      topology=header['topology'].decode(), rule=header['rule'].decode(),
+                      keys=arrays['keys'], stamp=arrays['stamp'], ages=arrays['ages'],
+                      pans=int(header['pans']), evicted=int(header['evicted']))
+
+
+def snapshot(life):
+    # Checkpoint of a running board, cheap enough to take between frames:
+    # engines never change a board once returned and the parked colours are
+    # replaced rather than changed on a pan, only the age grid is copied
+    colors = life.colors
+    world = isinstance(colors, colorLife.WorldColorStore)
+    return Checkpoint(colors.age.copy(), life.count, board=life.board, viewX=life.viewX, viewY=life.viewY,
+                      topology=life.topology, rule=life.rule.text,
+                      keys=colors.keys if world else None, stamp=colors.stamp if world else None,
+                      ages=colors.parked if world else None,
+                      pans=colors.pans if world else 0, evicted=colors.evicted if world else 0)
+
+
+class CheckpointWriter(threading.Thread):
+    # Writes checkpoints off the frame loop, every interval seconds. Holds at
+    # most one waiting, a snapshot offered while one is still being written is
+    # dropped rather than queued.
+    def __init__(self, path, interval):
+        super().__init__(daemon=True)
+        self.path = path
+        self.interval = interval
+        self.last = time.time()
+        self.pending = queue.Queue(maxsize=1)
+        self.written = 0
+
+    def due(self):
+        return time.time() - self.last >= self.interval
+
+    def offer(self, checkpoint):
+        self.last = time.time()
+        try:
+            self.pending.put_nowait(checkpoint)
+        except queue.Full:
+            pass
+
+    def run(self):
+        while True:
+            checkpoint = self.pending.get()
+            if checkpoint is None:
+                return
+            try:
+                checkpoint.write(self.path)
+                self.written += 1
+            except OSError as e:
+                print("can't write checkpoint '{}': {}".format(self.path, e))
+
+    def stop(self):
+        # writes out what was offered before returning
+        self.pending.put(None)
+        self.join()
@@ -0,0 +1,186 @@
+import numpy as np
+
+# cell entropy constants, a fresh cell starts dark red, brightens through
+# red and green, cools to blue and flashes once before settling
+maxIntensity = 255
+startClr = (70, 0, 0)
+decInc = 2
+
+stateNone = 0
+stateUp = 1
+stateStay = 2
+stateFall = 3
+
+rPeakVal = 255
+gPeakVal = 150
+bStartVal = 70
+bPeak = 254
+bEndVal = 90
+flashVal = maxIntensity - 1  # [maxIntensity] * 3 is reserved for special entities like spawned spaceships
+
+
+def clamp(l, h, v):
+    if v < l:
+        return l
+    if v > h:
+        return h
+    return v
+
+
+def decayCell(r, g, b, rState, gState, bState, decayed):
+    # one frame of a single cell's colour state machine
+    if r == flashVal and g == flashVal and b == flashVal:  # last gasp flash
+        r, g, b = 0, 0, bEndVal
+        decayed = True
+    if decayed:
+        return r, g, b, rState, gState, bState, True
+
+    # RED
+    if rState == stateUp:
+        if r < maxIntensity:
+            r += decInc
+        if r >= rPeakVal:
+            rState = stateStay
+            gState = stateUp
+    elif rState == stateFall and r > 0:
+        r -= decInc
+        if r <= 0:
+            rState = stateNone
+            r, g, b = 0, 0, bStartVal
+            bState = stateUp
+
+    # GREEN
+    if gState == stateUp:
+        if g < maxIntensity:
+            g += decInc
+        if g >= gPeakVal:
+            gState = stateFall
+            rState = stateFall
+    elif g > 0:
+        g -= decInc * 2
+
+    # BLUE
+    if bState == stateUp:
+        if b < maxIntensity:
+            b += decInc
+        if b >= bPeak:
+            bState = stateFall
+    elif bState == stateFall:
+        b -= decInc
+        if b == bEndVal + decInc:
+            # flash before decayed completely
+            r, g, b = flashVal, flashVal, flashVal
+
+    r = clamp(0, maxIntensity, r)
+    g = clamp(0, maxIntensity, g)
+    b = clamp(0, maxIntensity, b)
+    return r, g, b, rState, gState, bState, False
+
+
+paletteKey = None
+paletteTable = None
+
+
+def palette():
+    # Every cell walks the same colour path, so it is worked out once into a
+    # table indexed by age: row a is the colour of a cell that has decayed a
+    # times. The last row is the settled, decayed colour. Rebuilt whenever the
+    # decay constants above have been changed.
+    global paletteKey, paletteTable
+    key = (maxIntensity, startClr, decInc, rPeakVal, gPeakVal, bStartVal, bPeak, bEndVal, flashVal)
+    if key != paletteKey:
+        state = startClr + (stateUp, stateNone, stateNone, False)
+        rows = [state[:3]]
+        while not state[6]:
+            state = decayCell(*state)
+            rows.append(state[:3])
+        paletteTable = np.array(rows, dtype=np.uint8)
+        paletteKey = key
+    return paletteTable
+
+
+class ColorStore:
+    # Colour state of every cell on the board as its age, the number of frames
+    # it has been drawn alive, indexed [y, x]. Colours come from the palette.
+    def __init__(self, shape):
+        self.shape = shape
+        self.table = palette()
+        self.last = len(self.table) - 1
+        self.age = np.zeros(shape, dtype=np.uint16)
+
+    def color(self, x, y):
+        return tuple(self.table[self.age[int(y), int(x)]].tolist())
+
+    def colors(self, xs, ys):
+        # (n, 3) colours of the given cells
+        return self.table[self.age[ys, xs]]
+
+    def decayCells(self, xs, ys, steps=1):
+        # advance the given cells steps frames at once, returns how many are done
+        age = np.minimum(self.age[ys, xs] + steps, self.last)
+        self.age[ys, xs] = age
+        return int(np.count_nonzero(age == self.last))
+
+    def nbytes(self):
+        return self.age.nbytes
+
+    def entries(self):
+        # cells that have been alive since the seed, the grid holds every cell either way
+        return int(np.count_nonzero(self.age))
+
+
+class WorldColorStore(ColorStore):
+    # Colour state for an unbounded board. The screen keeps the age grid of
+    # ColorStore; when the view pans, the ages of cells scrolling off are
+    # parked by board cell in three parallel arrays sorted by packed key, and
+    # come back if they scroll into view again. Past cap parked cells the ones
+    # parked longest ago are evicted.
+    bias = 1 << 30
+
+    def __init__(self, shape, cap=2000000):
+        super().__init__(shape)
+        self.cap = cap
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.parked = np.zeros(0, dtype=np.uint16)
+        self.stamp = np.zeros(0, dtype=np.int64)  # pan the cell was parked on
+        self.originX = 0  # board cell at screen (0, 0)
+        self.originY = 0
+        self.pans = 0
+        self.evicted = 0
+
+    def shift(self, dx, dy):
+        h, w = self.shape
+        b = self.bias
+        self.pans += 1
+
+        # park the whole view, newer entries replace older ones for the same cell
+        ys, xs = np.nonzero(self.age)
+        keys = np.concatenate((self.keys, ((ys + self.originY + b) << 32) | (xs + self.originX + b)))
+        parked = np.concatenate((self.parked, self.age[ys, xs]))
+        stamp = np.concatenate((self.stamp, np.full(len(xs), self.pans, dtype=np.int64)))
+        order = np.argsort(keys, kind='stable')
+        keys, parked, stamp = keys[order], parked[order], stamp[order]
+        last = np.ones(len(keys), dtype=bool)
+        last[:-1] = keys[1:] != keys[:-1]
+
+        # bring back the cells in the new view
+        self.originX += dx
+        self.originY += dy
+        xs = (keys & 0xFFFFFFFF) - b - self.originX
+        ys = (keys >> 32) - b - self.originY
+        inside = last & (xs >= 0) & (ys >= 0) & (xs < w) & (ys < h)
+        self.age = np.zeros_like(self.age)
+        self.age[ys[inside], xs[inside]] = parked[inside]
+
+        keep = last & ~inside
+        kept = np.flatnonzero(keep)
+        if len(kept) > self.cap:
+            keep[kept[np.argsort(stamp[kept], kind='stable')[:len(kept) - self.cap]]] = False
+        self.evicted += int(np.count_nonzero(last & ~inside)) - int(np.count_nonzero(keep))
+        self.keys, self.parked, self.stamp = keys[keep], parked[keep], stamp[keep]
+
+    def nbytes(self):
+        return self.age.nbytes + self.keys.nbytes + self.parked.nbytes + self.stamp.nbytes
+
+    def entries(self):
+        return super().entries() + len(self.keys)
@@ -0,0 +1,61 @@
+from collections import deque
+import numpy as np
+
+
+def splitmix64(z):
+    # well mixed 64 bit value for each uint64 in z, wrapping like the C
+    # original, worked in place on z to save temporaries
+    z += np.uint64(0x9E3779B97F4A7C15)
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return z
+
+
+class CycleDetector:
+    # Zobrist hashing of the board: every cell has a 64 bit key and a
+    # generation hashes to the XOR of the keys of its live cells. Keys are
+    # splitmix64 of the packed cell coordinates rather than a table of random
+    # numbers, so nothing the size of the board is allocated and cells of an
+    # unbounded board hash the same wherever the view is. The hashes of the
+    # last maxPeriod generations are kept, a hash coming back means the board
+    # repeats, a still life being period 1. Only the hashes are stored, never
+    # board copies.
+    bias = 1 << 31
+
+    def __init__(self, maxPeriod=30, seed=0):
+        self.salt = np.uint64(seed)
+        self.maxPeriod = maxPeriod
+        self.recent = deque()  # (hash, generation), oldest first
+        self.seen = dict()  # hash -> generation
+        self.period = None
+        self.start = None
+
+    def hash(self, xs, ys):
+        if len(xs) == 0:
+            return 0
+        b = self.bias
+        cells = (ys + b).astype(np.uint64)
+        cells <<= np.uint64(32)
+        cells |= (xs + b).astype(np.uint64)
+        cells ^= self.salt
+        return int(np.bitwise_xor.reduce(splitmix64(cells)))
+
+    def update(self, xs, ys, generation):
+        # add a generation, returns the period once the board has started repeating
+        if self.period is not None:
+            return self.period
+        h = self.hash(xs, ys)
+        if h in self.seen:
+            self.start = self.seen[h]
+            self.period = generation - self.start
+            return self.period
+        self.recent.append((h, generation))
+        self.seen[h] = generation
+        if len(self.recent) > self.maxPeriod:
+            old, gen = self.recent.popleft()
+            if self.seen.get(old) == gen:
+                del self.seen[old]
+        return None
@@ -1,64 +1,102 @@
-import time
-from random import randint
+import numpy as np
 import pygame
-import threading
-import signal
-import math
-import main
 
-rectSize = 8
 white = (255, 255, 255)
 
 
+def brushOffsets(size, shape):
+    # cell offsets covered by a brush of size cells centred on the pointer
+    r = np.arange(size) - (size - 1) // 2
+    dx, dy = np.meshgrid(r, r)
+    if shape == 'circle':
+        c = (size - 1) / 2 - (size - 1) // 2  # half a cell off centre for even sizes
+        inside = (dx - c) ** 2 + (dy - c) ** 2 <= (size / 2) ** 2
+        dx, dy = dx[inside], dy[inside]
+    return dx.ravel(), dy.ravel()
+
+
+def lineCells(x0, y0, x1, y1):
+    # every cell on the segment between two cells, one per step along the
+    # longer axis, in integer arithmetic so the stroke has no gaps
+    n = max(abs(x1 - x0), abs(y1 - y0))
+    if n == 0:
+        return np.array([x0]), np.array([y0])
+    t = np.arange(n + 1)
+    xs = x0 + (2 * (x1 - x0) * t + n) // (2 * n)
+    ys = y0 + (2 * (y1 - y0) * t + n) // (2 * n)
+    return xs, ys
+
+
+class Stroke:
+    # cells painted so far in a boolean grid the size of the board, plus the
+    # screen areas painted since the last display update
+    def __init__(self, life):
+        self.life = life
+        self.shape = (life.yborder + 1, life.xborder + 1)
+        self.grid = np.zeros(self.shape, dtype=bool)
+        self.offsets = brushOffsets(max(life.brushSize, 1), life.brushShape)
+        self.last = None
+        self.dirty = []
+
+    def cell(self, pos):
+        return pos[0] // self.life.scale, pos[1] // self.life.scale
+
+    def paint(self, pos):
+        # brush along the segment from the last position to this one
+        x, y = self.cell(pos)
+        x0, y0 = self.last if self.last is not None else (x, y)
+        self.last = x, y
+        lx, ly = lineCells(x0, y0, x, y)
+        xs = (lx[:, None] + self.offsets[0]).ravel()
+        ys = (ly[:, None] + self.offsets[1]).ravel()
+        inside = (xs >= 0) & (ys >= 0) & (xs < self.shape[1]) & (ys < self.shape[0])
+        xs, ys = xs[inside], ys[inside]
+        fresh = ~self.grid[ys, xs]
+        self.grid[ys, xs] = True
+
+        scale = self.life.scale
+        screen = self.life.screen
+        for cx, cy in zip(xs[fresh].tolist(), ys[fresh].tolist()):
+            screen.fill(white, (cx * scale, cy * scale, scale, scale))
+        if len(xs):
+            left, top = int(xs.min()) * scale, int(ys.min()) * scale
+            self.dirty.append(pygame.Rect(left, top, (int(xs.max()) + 1) * scale - left,
+                                          (int(ys.max()) + 1) * scale - top))
+
+    def update(self):
+        # one display update for everything painted since the last one
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
+
+    def cells(self):
+        ys, xs = np.nonzero(self.grid)
+        return set(zip(xs.tolist(), ys.tolist()))
+
+
 def getDrawing(life, mouseDown):
-    board = set([])
-    # mouseDown = False
-    drawing = True
-    while drawing:
-        for evt in pygame.event.get():
+    # Paints while the left button is held and returns the cells on release.
+    # Events are drained in batches with one display update per batch, so a
+    # fast stroke doesn't flip the screen for every mouse event. A right
+    # click leaves for the settings screen.
+    stroke = Stroke(life)
+    while True:
+        events = [pygame.event.wait()] + pygame.event.get()
+        for evt in events:
             if evt.type == pygame.MOUSEBUTTONDOWN:
                 if evt.button == 3:
                     life.running = False
                     life.drawn = False
                     if mouseDown is False:
                         return None
-
                 mouseDown = True
-                x, y = evt.pos
-                rect = x - rectSize/2, y - rectSize/2, rectSize, rectSize
-                # pygame.draw.rect(life.screen, white, rect)
-                pygame.draw.circle(life.screen, white, [x, y], 4)
-                pygame.display.flip()
-                board = addSets(rect, board, life)
+                stroke.paint(evt.pos)
 
             if evt.type == pygame.MOUSEMOTION and mouseDown:
-                x, y = evt.pos
-                rect = x - rectSize/2, y - rectSize/2, rectSize, rectSize
-                # pygame.draw.rect(life.screen, white, rect)
-                pygame.draw.circle(life.screen, white, [x, y], 4)
-                pygame.display.flip()
-                board = addSets(rect, board, life)
+                stroke.paint(evt.pos)
 
             if evt.type == pygame.MOUSEBUTTONUP and mouseDown:
-                x, y = evt.pos
-                rect = x - rectSize/2, y - rectSize/2, rectSize, rectSize
-                # pygame.draw.rect(life.screen, white, rect)
-                pygame.draw.circle(life.screen, white, [x, y], 4)
-                pygame.display.flip()
-                board = addSets(rect, board, life)
-                drawing = False
-                return board
-
-
-def addSets(rect, board, life):
-    newBoard = set([])
-    nCells = rectSize * 2 / life.scale
-    x, y = 0, 0
-    for _ in range(int(rectSize / life.scale)):
-        for _ in range(rectSize):
-            newBoard.add(((x + rect[0])/life.scale, (y + rect[1])/life.scale))
-            x += life.scale
-        y += life.scale
-        x = 0
-    return board.union(newBoard)
-
+                stroke.paint(evt.pos)
+                stroke.update()
+                return stroke.cells()
+        stroke.update()
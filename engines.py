@@ -0,0 +1,632 @@
+import atexit
+import os
+from collections import Counter
+from functools import partial
+import multiprocessing
+import numpy as np
+import hashLife
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python 3.7, no tiled engine
+    shared_memory = None
+
+# clipped: cells past the border die, toroidal: edges wrap round,
+# unbounded: the board grows without limit and the screen is a viewport on it
+topologyList = ('clipped', 'toroidal', 'unbounded')
+
+
+def neighbors(cell):
+    x, y = cell
+    yield x - 1, y - 1
+    yield x, y - 1
+    yield x + 1, y - 1
+    yield x - 1, y
+    yield x + 1, y
+    yield x - 1, y + 1
+    yield x, y + 1
+    yield x + 1, y + 1
+
+
+def torusNeighbors(cell, w, h):
+    for x, y in neighbors(cell):
+        yield x % w, y % h
+
+
+class Board:
+    # Live cells as x and y int64 arrays, each cell once, as the grid engines
+    # produce them. Stands in for the set of (x, y) tuples wherever one is
+    # used, the set is only built the first time it is asked for, so drawing
+    # and colouring a generation never go through per cell Python objects.
+    def __init__(self, xs, ys):
+        self.xs = xs
+        self.ys = ys
+        self.set = None
+
+    def cells(self):
+        if self.set is None:
+            self.set = set(zip(self.xs.tolist(), self.ys.tolist()))
+        return self.set
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __iter__(self):
+        return iter(self.cells())
+
+    def __contains__(self, cell):
+        return cell in self.cells()
+
+    def __eq__(self, other):
+        return self.cells() == (other.cells() if isinstance(other, Board) else other)
+
+    def copy(self):
+        return set(self.cells())
+
+    def union(self, *others):
+        return self.cells().union(*others)
+
+
+def boardArrays(board):
+    # x and y arrays of a Board or of a set of (x, y) tuples
+    if isinstance(board, Board):
+        return board.xs, board.ys
+    xy = np.array(list(board), dtype=np.int64).reshape(-1, 2)
+    return xy[:, 0], xy[:, 1]
+
+
+def uniqueArrays(xs, ys):
+    # x and y arrays with repeated cells dropped
+    if len(xs) == 0:
+        return xs, ys
+    x0, y0 = xs.min(), ys.min()
+    w = int(xs.max() - x0) + 1
+    keys = np.unique((ys - y0) * w + (xs - x0))
+    return keys % w + x0, keys // w + y0
+
+
+class Engine:
+    # Engines keep their own representation of the board and hand back a
+    # Board, or for the set engine a set of (x, y) tuples, that the rest of
+    # Main works with. The representation is only rebuilt when Main passes in
+    # a board the engine did not produce (a fresh seed or a drawing added on
+    # top).
+    name = None
+    topologies = ('clipped', 'toroidal')
+
+    def __init__(self, life):
+        self.life = life
+        self.board = None
+        self.shape = None
+        # work done by the last step, for engines that skip quiet areas
+        self.cellsEvaluated = None
+        self.tilesEvaluated = None
+
+    def gridShape(self):
+        # a clipped board is bounded inclusively by xborder/yborder, as the
+        # set engine always was, a torus is the cols x rows on screen so it
+        # wraps at the screen edge rather than one cell past it
+        if self.life.topology == 'toroidal':
+            return self.life.rows, self.life.cols
+        return self.life.yborder + 1, self.life.xborder + 1
+
+    def iterate(self, board):
+        if board is not self.board or self.shape != self.gridShape():
+            self.shape = self.gridShape()
+            self.load(board)
+        self.step()
+        self.board = self.toBoard()
+        return self.board
+
+    def seed(self, xs, ys):
+        # a new board from x and y arrays, loaded into the engine straight
+        # from the arrays so the first iterate can step it right away
+        self.shape = self.gridShape()
+        if self.life.topology == 'toroidal':
+            # seeds drawn past the border come round the other side
+            xs, ys = xs % self.shape[1], ys % self.shape[0]
+        elif self.life.topology == 'clipped':
+            # seeds past the border are dead before the first step, as the grid engines load them
+            inside = (xs >= 0) & (ys >= 0) & (xs < self.shape[1]) & (ys < self.shape[0])
+            xs, ys = xs[inside], ys[inside]
+        self.board = Board(*uniqueArrays(xs.astype(np.int64), ys.astype(np.int64)))
+        self.loadArrays(xs, ys)
+        return self.board
+
+    def iterateMany(self, board, generations):
+        for _ in range(generations):
+            board = self.iterate(board)
+        return board
+
+    def load(self, board):
+        if isinstance(board, Board):
+            self.loadArrays(board.xs, board.ys)
+        else:
+            self.loadGrid(boardToGrid(board, self.shape))
+
+    def loadArrays(self, xs, ys):
+        self.loadGrid(arraysToGrid(xs, ys, self.shape))
+
+    def loadGrid(self, grid):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def step(self):
+        raise NotImplementedError
+
+    def toBoard(self):
+        raise NotImplementedError
+
+
+class SetEngine(Engine):
+    name = 'set'
+    topologies = topologyList
+
+    def iterate(self, board):
+        new_board = set([])
+        table = self.life.rule.table
+        topology = self.life.topology
+        around = neighbors
+        if topology == 'toroidal':
+            h, w = self.gridShape()
+            around = partial(torusNeighbors, w=w, h=h)
+            if board is not self.board:
+                board = set((x % w, y % h) for x, y in board)
+        candidates = board.union(set(n for cell in board for n in around(cell)))
+        for cell in candidates:
+            x, y = cell
+            if topology == 'clipped':
+                if x > self.life.xborder or y > self.life.yborder:
+                    continue
+                if x < 0 or y < 0:
+                    continue
+
+            count = sum((n in board) for n in around(cell))
+            if table[cell in board][count]:
+                new_board.add(cell)
+
+        self.board = new_board
+        return new_board
+
+    def loadArrays(self, xs, ys):
+        pass
+
+
+class SparseEngine(Engine):
+    # Cells are packed into single ints, (y + 1) * stride + x + 1, with a one
+    # cell frame so neighbours past the border stay distinct. Neighbour
+    # contributions are counted in one pass and the rule applied to the counts.
+    # On a torus the counts landing on the frame are folded onto the opposite
+    # edge, unbounded boards use a stride and bias big enough to never wrap.
+    name = 'sparse'
+    topologies = topologyList
+    bias = 1 << 30
+
+    def __init__(self, life):
+        super().__init__(life)
+        self.cells = None
+        self.stride = 0
+        self.offsets = None
+
+    def load(self, board):
+        if isinstance(board, Board):
+            self.loadArrays(board.xs, board.ys)
+            return
+        h, w = self.shape
+        if self.life.topology == 'unbounded':
+            self.stride = 1 << 32
+            s, b = self.stride, self.bias
+            self.cells = set((int(y) + b) * s + int(x) + b for x, y in board)
+        else:
+            self.stride = w + 2
+            s = self.stride
+            self.cells = set((int(y) + 1) * s + int(x) + 1 for x, y in board
+                             if 0 <= x < w and 0 <= y < h)
+        self.offsets = (-s - 1, -s, -s + 1, -1, 1, s - 1, s, s + 1)
+
+    def loadArrays(self, xs, ys):
+        h, w = self.shape
+        if self.life.topology == 'unbounded':
+            self.stride = 1 << 32
+            s, b = self.stride, self.bias
+            self.cells = set(((ys + b) * s + xs + b).tolist())
+        else:
+            self.stride = w + 2
+            s = self.stride
+            inside = (xs >= 0) & (ys >= 0) & (xs < w) & (ys < h)
+            self.cells = set(((ys[inside] + 1) * s + xs[inside] + 1).tolist())
+        self.offsets = (-s - 1, -s, -s + 1, -1, 1, s - 1, s, s + 1)
+
+    def step(self):
+        h, w = self.shape
+        s = self.stride
+        cells = self.cells
+        table = self.life.rule.table
+        counts = Counter(c + d for c in cells for d in self.offsets)
+        if self.life.topology == 'unbounded':
+            self.cells = set(c for c, n in counts.items() if table[c in cells][n])
+        else:
+            lo, hi = s, (h + 1) * s
+            if self.life.topology == 'toroidal':
+                for c in [c for c in counts if not (lo < c < hi and 0 < c % s <= w)]:
+                    x, y = (c % s - 1) % w, (c // s - 1) % h
+                    counts[(y + 1) * s + x + 1] += counts.pop(c)
+            self.cells = set(c for c, n in counts.items()
+                             if table[c in cells][n] and lo < c < hi and 0 < c % s <= w)
+        if table[1][0]:
+            # S0, isolated cells never show up in the counts
+            self.cells.update(c for c in cells if c not in counts)
+
+    def toBoard(self):
+        s = self.stride
+        b = self.bias if self.life.topology == 'unbounded' else 1
+        cells = np.fromiter(self.cells, dtype=np.int64, count=len(self.cells))
+        return Board(cells % s - b, cells // s - b)
+
+
+def boardToGrid(board, shape):
+    cells = np.array([(int(x), int(y)) for x, y in board], dtype=np.int64).reshape(-1, 2)
+    return arraysToGrid(cells[:, 0], cells[:, 1], shape)
+
+
+def arraysToGrid(xs, ys, shape):
+    grid = np.zeros(shape, dtype=np.uint8)
+    inside = (xs >= 0) & (ys >= 0) & (xs < shape[1]) & (ys < shape[0])
+    grid[ys[inside], xs[inside]] = 1
+    return grid
+
+
+def gridToBoard(grid):
+    ys, xs = np.nonzero(grid)
+    return Board(xs.astype(np.int64), ys.astype(np.int64))
+
+
+def neighborCounts(grid, wrap=False):
+    # sum of the eight shifted slices of a padded copy, cells past the border
+    # count as dead or, wrapped, as the cells on the opposite edge
+    p = np.pad(grid, 1, mode='wrap' if wrap else 'constant')
+    return (p[:-2, :-2] + p[:-2, 1:-1] + p[:-2, 2:] +
+            p[1:-1, :-2] + p[1:-1, 2:] +
+            p[2:, :-2] + p[2:, 1:-1] + p[2:, 2:])
+
+
+class DenseEngine(Engine):
+    name = 'dense'
+
+    def __init__(self, life):
+        super().__init__(life)
+        self.grid = None
+
+    def loadGrid(self, grid):
+        self.grid = grid
+
+    def step(self):
+        count = neighborCounts(self.grid, self.life.topology == 'toroidal')
+        self.grid = self.life.rule.apply(count, self.grid).view(np.uint8)
+
+    def toBoard(self):
+        return gridToBoard(self.grid)
+
+
+def dilateTiles(mask, wrap=False):
+    p = np.pad(mask, 1, mode='wrap' if wrap else 'constant')
+    return (p[:-2, :-2] | p[:-2, 1:-1] | p[:-2, 2:] |
+            p[1:-1, :-2] | p[1:-1, 1:-1] | p[1:-1, 2:] |
+            p[2:, :-2] | p[2:, 1:-1] | p[2:, 2:])
+
+
+class IncrementalEngine(Engine):
+    # The grid is cut into square tiles. A tile is only re-evaluated when it
+    # or one of its eight neighbour tiles changed in the previous generation,
+    # every other tile is flagged stable and skipped. On a torus the halo
+    # holds a copy of the opposite edge and tile activity wraps too.
+    name = 'incremental'
+    tileSize = 32
+
+    def __init__(self, life):
+        super().__init__(life)
+        self.grid = None
+        self.inside = None
+        self.active = None
+
+    def loadGrid(self, grid):
+        h, w = self.shape
+        t = self.tileSize
+        tilesY, tilesX = -(-h // t), -(-w // t)
+        # one dead cell of halo around the tiled area
+        self.grid = np.zeros((tilesY * t + 2, tilesX * t + 2), dtype=np.uint8)
+        self.grid[1:h + 1, 1:w + 1] = grid
+        self.inside = np.zeros(self.grid.shape, dtype=bool)
+        self.inside[1:h + 1, 1:w + 1] = True
+        self.active = np.ones((tilesY, tilesX), dtype=bool)
+
+    def wrapHalo(self):
+        h, w = self.shape
+        g = self.grid
+        g[0, 1:w + 1] = g[h, 1:w + 1]
+        g[h + 1, 1:w + 1] = g[1, 1:w + 1]
+        g[0:h + 2, 0] = g[0:h + 2, w]
+        g[0:h + 2, w + 1] = g[0:h + 2, 1]
+
+    def step(self):
+        t = self.tileSize
+        toroidal = self.life.topology == 'toroidal'
+        if toroidal:
+            self.wrapHalo()
+        ty, tx = np.nonzero(dilateTiles(self.active, toroidal))
+
+        # gather every tile to evaluate with its halo, (tiles, t + 2, t + 2)
+        span = np.arange(t + 2)
+        rows = (ty * t)[:, None] + span
+        cols = (tx * t)[:, None] + span
+        win = self.grid[rows[:, :, None], cols[:, None, :]]
+
+        count = (win[:, :-2, :-2] + win[:, :-2, 1:-1] + win[:, :-2, 2:] +
+                 win[:, 1:-1, :-2] + win[:, 1:-1, 2:] +
+                 win[:, 2:, :-2] + win[:, 2:, 1:-1] + win[:, 2:, 2:])
+        old = win[:, 1:-1, 1:-1]
+        inner = (rows[:, 1:-1, None], cols[:, None, 1:-1])
+        new = self.life.rule.apply(count, old) & self.inside[inner]
+        new = new.view(np.uint8)
+
+        changed = (new != old).any(axis=(1, 2))
+        self.grid[inner] = new
+        self.active = np.zeros_like(self.active)
+        self.active[ty[changed], tx[changed]] = True
+
+        self.tilesEvaluated = len(ty)
+        self.cellsEvaluated = len(ty) * t * t
+
+    def toBoard(self):
+        h, w = self.shape
+        return gridToBoard(self.grid[1:h + 1, 1:w + 1])
+
+
+# state of a tiled engine worker process, the two shared grids it steps between
+workerGrids = None
+
+
+def attachWorker(names, shape):
+    global workerGrids
+    shms = [shared_memory.SharedMemory(name=name) for name in names]
+    workerGrids = (shms, [np.ndarray(shape, dtype=np.uint8, buffer=shm.buf) for shm in shms])
+
+
+def stepBand(task):
+    # rows y0..y1 of grid src into the other grid, reading one halo row on
+    # each side straight from shared memory
+    src, y0, y1, rule, toroidal = task
+    grid = workerGrids[1][src]
+    out = workerGrids[1][1 - src]
+    if toroidal:
+        # halo rows from the other edge, the wrapped rows the padding adds are dropped
+        band = grid[np.arange(y0 - 1, y1 + 1) % len(grid)]
+        count = neighborCounts(band, True)[1:-1]
+    else:
+        top = max(y0 - 1, 0)
+        band = grid[top:y1 + 1]
+        count = neighborCounts(band)[y0 - top:y0 - top + y1 - y0]
+    old = grid[y0:y1]
+    out[y0:y1] = rule.apply(count, old)
+    return y1 - y0
+
+
+class TiledEngine(Engine):
+    # The board is split into horizontal bands stepped in parallel by a
+    # process pool. Both generations live in shared memory so only the band
+    # bounds travel to the workers.
+    name = 'tiled'
+
+    def __init__(self, life):
+        super().__init__(life)
+        self.workers = life.workers or os.cpu_count() or 1
+        self.pool = None
+        self.shms = None
+        self.grids = None
+        self.src = 0
+        self.bands = None
+
+    def loadGrid(self, grid):
+        h, w = self.shape
+        if self.grids is None or self.grids[0].shape != self.shape:
+            self.close()
+            self.shms = [shared_memory.SharedMemory(create=True, size=h * w) for _ in range(2)]
+            self.grids = [np.ndarray(self.shape, dtype=np.uint8, buffer=shm.buf) for shm in self.shms]
+            # spawn rather than fork, forking a process with SDL threads running can deadlock
+            self.pool = multiprocessing.get_context('spawn').Pool(
+                self.workers, initializer=attachWorker, initargs=([shm.name for shm in self.shms], self.shape))
+            atexit.register(self.close)
+            edges = np.linspace(0, h, min(self.workers, h) + 1).astype(int)
+            self.bands = list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+        self.src = 0
+        self.grids[0][:] = grid
+
+    def step(self):
+        rule = self.life.rule
+        toroidal = self.life.topology == 'toroidal'
+        self.pool.map(stepBand, [(self.src, y0, y1, rule, toroidal) for y0, y1 in self.bands])
+        self.src = 1 - self.src
+
+    def toBoard(self):
+        return gridToBoard(self.grids[self.src])
+
+    def close(self):
+        if self.pool is not None:
+            # let the workers exit on their own, SDL in them swallows SIGTERM
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.shms is not None:
+            self.grids = None
+            for shm in self.shms:
+                shm.close()
+                shm.unlink()
+            self.shms = None
+
+
+def packGrid(grid, words):
+    # 64 cells per word, bit i of word j is column 64 * j + i
+    h, w = grid.shape
+    padded = np.zeros((h, words * 64), dtype=np.uint8)
+    padded[:, :w] = grid
+    return np.packbits(padded, axis=1, bitorder='little').view('<u8')
+
+
+def unpackGrid(packed, width):
+    bits = np.unpackbits(packed.view(np.uint8), axis=1, bitorder='little')
+    return bits[:, :width]
+
+
+def fullAdd(a, b, c):
+    axb = a ^ b
+    return axb ^ c, (a & b) | (c & axb)
+
+
+def halfAdd(a, b):
+    return a ^ b, a & b
+
+
+class BitEngine(Engine):
+    name = 'bits'
+
+    def __init__(self, life):
+        super().__init__(life)
+        self.rows = None
+        self.width = 0
+        self.lastMask = None
+
+    def loadGrid(self, grid):
+        h, self.width = self.shape
+        words = (self.width + 63) // 64
+        self.rows = packGrid(grid, words)
+        spare = words * 64 - self.width
+        self.lastMask = np.uint64(0xFFFFFFFFFFFFFFFF >> spare)
+
+    def west(self, rows):
+        # each cell takes the value of its left neighbour, carrying across words
+        out = rows << np.uint64(1)
+        out[:, 1:] |= rows[:, :-1] >> np.uint64(63)
+        if self.life.topology == 'toroidal':
+            out[:, 0] |= (rows[:, -1] >> np.uint64((self.width - 1) % 64)) & np.uint64(1)
+        return out
+
+    def east(self, rows):
+        out = rows >> np.uint64(1)
+        out[:, :-1] |= rows[:, 1:] << np.uint64(63)
+        if self.life.topology == 'toroidal':
+            # the spare bits past the last column are always clear
+            out[:, -1] |= (rows[:, 0] & np.uint64(1)) << np.uint64((self.width - 1) % 64)
+        return out
+
+    def step(self):
+        mid = self.rows
+        if self.life.topology == 'toroidal':
+            up = np.roll(mid, 1, axis=0)
+            down = np.roll(mid, -1, axis=0)
+        else:
+            up = np.zeros_like(mid)
+            up[1:] = mid[:-1]
+            down = np.zeros_like(mid)
+            down[:-1] = mid[1:]
+
+        # per row sums of (west, centre, east), 2 bits each; the middle row
+        # leaves out the cell itself
+        t0, t1 = fullAdd(self.west(up), up, self.east(up))
+        b0, b1 = fullAdd(self.west(down), down, self.east(down))
+        m0, m1 = halfAdd(self.west(mid), self.east(mid))
+
+        # add the three rows into a 4 bit count
+        s0, c0 = fullAdd(t0, b0, m0)
+        x1, x2 = fullAdd(t1, b1, m1)
+        s1, y2 = halfAdd(x1, c0)
+        s2 = x2 ^ y2
+
+        rule = self.life.rule
+        if rule.isConway():
+            # B3/S23: count 3 always lives, count 2 keeps a live cell, 8 has s3 set and s0-s2 clear
+            new = s1 & ~s2 & (s0 | mid)
+        else:
+            new = self.ruleBits(rule, (s0, s1, s2, x2 & y2), mid)
+        new[:, -1] &= self.lastMask
+        self.rows = new
+
+    @staticmethod
+    def ruleBits(rule, bits, mid):
+        # OR of one AND term per count the rule keeps alive, each term matching
+        # the four count bits
+        new = np.zeros_like(mid)
+        for n in range(9):
+            b, s = rule.table[0][n], rule.table[1][n]
+            if not (b or s):
+                continue
+            term = ~np.zeros_like(mid)
+            for i, bit in enumerate(bits):
+                term &= bit if n >> i & 1 else ~bit
+            if b != s:
+                term &= mid if s else ~mid
+            new |= term
+        return new
+
+    def toBoard(self):
+        return gridToBoard(unpackGrid(self.rows, self.width))
+
+
+class HashLifeEngine(Engine):
+    # the quadtree universe is unbounded, it has no border to clip cells at
+    # or wrap them round, so the other topologies fall back to the grid engines
+    name = 'hashlife'
+    topologies = ('unbounded',)
+
+    def __init__(self, life):
+        super().__init__(life)
+        self.universe = hashLife.HashLife(life.hashLifeNodes, life.rule)
+
+    def load(self, board):
+        self.universe.setCells(board)
+
+    def loadArrays(self, xs, ys):
+        self.load(self.board)
+
+    def step(self):
+        self.universe.step(1)
+
+    def skip(self, generations):
+        self.universe.step(generations)
+        self.board = self.toBoard()
+        return self.board
+
+    def iterateMany(self, board, generations):
+        # one jump through the memo rather than one step per generation
+        if board is not self.board or self.shape != self.gridShape():
+            self.shape = self.gridShape()
+            self.load(board)
+        return self.skip(generations)
+
+    def toBoard(self):
+        xy = np.array(self.universe.getCells(), dtype=np.int64).reshape(-1, 2)
+        return Board(xy[:, 0], xy[:, 1])
+
+
+engineList = {
+    SetEngine.name: SetEngine,
+    SparseEngine.name: SparseEngine,
+    DenseEngine.name: DenseEngine,
+    BitEngine.name: BitEngine,
+    HashLifeEngine.name: HashLifeEngine,
+    IncrementalEngine.name: IncrementalEngine,
+}
+if shared_memory is not None:
+    engineList[TiledEngine.name] = TiledEngine
+
+
+def makeEngine(name, life):
+    if name not in engineList:
+        print("unknown engine '{}', using 'set'".format(name))
+        name = SetEngine.name
+    if life.topology not in engineList[name].topologies:
+        fallback = SparseEngine.name if life.topology == 'unbounded' else DenseEngine.name
+        print("engine '{}' has no {} topology, using '{}'".format(name, life.topology, fallback))
+        name = fallback
+    return engineList[name](life)
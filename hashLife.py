@@ -0,0 +1,229 @@
+"""
+Hashlife: memoized quadtree stepping for jumping far ahead.
+
+Adapted from Bill Gosper's algorithm as described in
+https://johnhw.github.io/hashlife/index.md.html
+"""
+
+import ruleLife
+
+
+class Node:
+    __slots__ = ('k', 'nw', 'ne', 'sw', 'se', 'n')
+
+    def __init__(self, k, nw, ne, sw, se, n):
+        self.k = k  # level, the node covers 2^k x 2^k cells
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.n = n  # population
+
+
+off = Node(0, None, None, None, None, 0)
+on = Node(0, None, None, None, None, 1)
+
+
+class HashLife:
+    def __init__(self, maxNodes=1000000, rule=None):
+        # canonical node table, equal quadrants are always the same object so
+        # identity can be used for hashing the successor memo
+        self.nodes = dict()
+        self.memo = dict()
+        self.zeros = [off]
+        self.maxNodes = maxNodes
+        self.evictions = 0
+        self.rule = rule or ruleLife.Rule()  # the memo is only valid for one rule
+
+        self.root = self.zero(3)
+        self.originX = 0  # cell position of the root's top left corner
+        self.originY = 0
+        self.generation = 0
+
+    def join(self, nw, ne, sw, se):
+        key = (nw, ne, sw, se)
+        node = self.nodes.get(key)
+        if node is None:
+            node = Node(nw.k + 1, nw, ne, sw, se, nw.n + ne.n + sw.n + se.n)
+            self.nodes[key] = node
+        return node
+
+    def zero(self, k):
+        while len(self.zeros) <= k:
+            z = self.zeros[-1]
+            self.zeros.append(self.join(z, z, z, z))
+        return self.zeros[k]
+
+    def expand(self, node):
+        # same content, twice the size, centred
+        z = self.zero(node.k - 1)
+        return self.join(self.join(z, z, z, node.nw), self.join(z, z, node.ne, z),
+                         self.join(z, node.sw, z, z), self.join(node.se, z, z, z))
+
+    def evict(self):
+        # drop the successor memo and every node the root no longer reaches
+        self.evictions += 1
+        self.memo = dict()
+        self.nodes = dict()
+        self.zeros = [off]
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.k == 0:
+                continue
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key in self.nodes:
+                continue
+            self.nodes[key] = node
+            stack.extend(key)
+
+    def setCells(self, cells):
+        self.memo = dict()
+        self.generation = 0
+        cells = [(int(x), int(y)) for x, y in cells]
+        if not cells:
+            self.root = self.zero(3)
+            self.originX = self.originY = 0
+            return
+        minX = min(x for x, y in cells)
+        minY = min(y for x, y in cells)
+        level = dict(((x - minX, y - minY), on) for x, y in cells)
+
+        # pair up quadrants level by level until one node holds everything
+        k = 0
+        while len(level) > 1 or k < 3:
+            z = self.zero(k)
+            nextLevel = dict()
+            while level:
+                x, y = next(iter(level))
+                x, y = x - (x & 1), y - (y & 1)
+                nw = level.pop((x, y), z)
+                ne = level.pop((x + 1, y), z)
+                sw = level.pop((x, y + 1), z)
+                se = level.pop((x + 1, y + 1), z)
+                nextLevel[x >> 1, y >> 1] = self.join(nw, ne, sw, se)
+            level = nextLevel
+            k += 1
+        self.root = level.popitem()[1]
+        self.originX = minX
+        self.originY = minY
+
+    def getCells(self):
+        cells = []
+        stack = [(self.root, self.originX, self.originY)]
+        while stack:
+            node, x, y = stack.pop()
+            if node.n == 0:
+                continue
+            if node.k == 0:
+                cells.append((x, y))
+                continue
+            half = 1 << (node.k - 1)
+            stack.append((node.nw, x, y))
+            stack.append((node.ne, x + half, y))
+            stack.append((node.sw, x, y + half))
+            stack.append((node.se, x + half, y + half))
+        return cells
+
+    def population(self):
+        return self.root.n
+
+    def isPadded(self, node):
+        # all live cells sit in the central half of the node
+        return (node.k >= 3 and
+                node.nw.n == node.nw.se.se.n and
+                node.ne.n == node.ne.sw.sw.n and
+                node.sw.n == node.sw.ne.ne.n and
+                node.se.n == node.se.nw.nw.n)
+
+    def life4x4(self, m):
+        # level 2 base case, one generation of the centre 2x2
+        cells = [[m.nw.nw.n, m.nw.ne.n, m.ne.nw.n, m.ne.ne.n],
+                 [m.nw.sw.n, m.nw.se.n, m.ne.sw.n, m.ne.se.n],
+                 [m.sw.nw.n, m.sw.ne.n, m.se.nw.n, m.se.ne.n],
+                 [m.sw.sw.n, m.sw.se.n, m.se.sw.n, m.se.se.n]]
+        table = self.rule.table
+        out = []
+        for y in (1, 2):
+            for x in (1, 2):
+                count = (cells[y - 1][x - 1] + cells[y - 1][x] + cells[y - 1][x + 1] +
+                         cells[y][x - 1] + cells[y][x + 1] +
+                         cells[y + 1][x - 1] + cells[y + 1][x] + cells[y + 1][x + 1])
+                if table[cells[y][x]][count]:
+                    out.append(on)
+                else:
+                    out.append(off)
+        return self.join(*out)
+
+    def successor(self, m, j):
+        # centre 2^(k-1) square of m advanced 2^j generations, at most 2^(k-2)
+        j = min(j, m.k - 2)
+        key = (m, j)
+        result = self.memo.get(key)
+        if result is not None:
+            return result
+
+        if m.n == 0:
+            result = m.nw
+        elif m.k == 2:
+            result = self.life4x4(m)
+        else:
+            join = self.join
+            c1 = self.successor(m.nw, j)
+            c2 = self.successor(join(m.nw.ne, m.ne.nw, m.nw.se, m.ne.sw), j)
+            c3 = self.successor(m.ne, j)
+            c4 = self.successor(join(m.nw.sw, m.nw.se, m.sw.nw, m.sw.ne), j)
+            c5 = self.successor(join(m.nw.se, m.ne.sw, m.sw.ne, m.se.nw), j)
+            c6 = self.successor(join(m.ne.sw, m.ne.se, m.se.nw, m.se.ne), j)
+            c7 = self.successor(m.sw, j)
+            c8 = self.successor(join(m.sw.ne, m.se.nw, m.sw.se, m.se.sw), j)
+            c9 = self.successor(m.se, j)
+            if j < m.k - 2:
+                # the nine overlapping sub-squares already advanced 2^j, just
+                # stitch their centres together
+                result = join(join(c1.se, c2.sw, c4.ne, c5.nw), join(c2.se, c3.sw, c5.ne, c6.nw),
+                              join(c4.se, c5.sw, c7.ne, c8.nw), join(c5.se, c6.sw, c8.ne, c9.nw))
+            else:
+                # half way there, advance the four overlapping quadrants again
+                result = join(self.successor(join(c1, c2, c4, c5), j),
+                              self.successor(join(c2, c3, c5, c6), j),
+                              self.successor(join(c4, c5, c7, c8), j),
+                              self.successor(join(c5, c6, c8, c9), j))
+        self.memo[key] = result
+        return result
+
+    def advance(self, j):
+        # advance the whole universe by 2^j generations in one step
+        if len(self.nodes) > self.maxNodes:
+            self.evict()
+        root = self.root
+        # keep the pattern inside the central half and give it 2^j cells of
+        # room to spread on every side
+        while root.k < j + 3 or not self.isPadded(root):
+            half = 1 << (root.k - 1)
+            root = self.expand(root)
+            self.originX -= half
+            self.originY -= half
+        result = self.successor(root, j)
+        self.originX += 1 << (root.k - 2)
+        self.originY += 1 << (root.k - 2)
+        self.root = result
+        self.generation += 1 << j
+        return result
+
+    def step(self, generations):
+        # any number of generations as a sum of powers of two
+        j = 0
+        while generations:
+            if generations & 1:
+                self.advance(j)
+            generations >>= 1
+            j += 1
+        return self.generation
+
+
+def fastForward(board, generations, maxNodes=1000000, rule=None):
+    universe = HashLife(maxNodes, rule)
+    universe.setCells(board)
+    universe.step(generations)
+    return set(universe.getCells())
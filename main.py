@@ -13,13 +13,22 @@ http://codereview.stackexchange.com/a/108121
 """
 
 import time
-from random import randint
 import pygame
 import threading
 import signal
-import math
 import drawLife
 import settings
+import engines
+import hashLife
+import colorLife
+import cycleLife
+import renderLife
+import pipeline
+import patternLife
+import ruleLife
+import seedLife
+import metrics
+import checkpointLife
 import configparser
 import os
 
@@ -28,55 +37,8 @@ os.environ['SDL_VIDEO_CENTERED'] = '1'
 pygame.init()
 
 
-def neighbors(cell):
-    x, y = cell
-    yield x - 1, y - 1
-    yield x, y - 1
-    yield x + 1, y - 1
-    yield x - 1, y
-    yield x + 1, y
-    yield x - 1, y + 1
-    yield x, y + 1
-    yield x + 1, y + 1
-
-
-def pyGameExit():
-    for event in pygame.event.get():
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                return True
-
-
-def keyStrGen(x, y):
-    return str(x) + "," + str(y)
-
-
-def clamp(l, h, v):
-    if v < l:
-        return l
-    if v > h:
-        return h
-    return v
-
-
-def putInCircle(board, cx, cy, r):
-    new_board = set([])
-    for cell in board:
-        x, y = cell
-        hypotenuse = math.sqrt((x - cx) ** 2 + (y - cy) ** 2)
-        if hypotenuse <= r:
-            new_board.add(cell)
-    return new_board
-
-
-def removeFromCircle(board, cx, cy, r):
-    new_board = set([])
-    for cell in board:
-        x, y = cell
-        hypotenuse = math.sqrt((x - cx) ** 2 + (y - cy) ** 2)
-        if hypotenuse >= r:
-            new_board.add(cell)
-    return new_board
+# unbounded boards pan by an eighth of the screen per key press
+panKeys = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0), pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1)}
 
 
 def isGlider(x, Y):
@@ -84,18 +46,20 @@ def isGlider(x, Y):
 
 
 class Main:
+    maxTurbo = 4096
+
     def __init__(self):
         self.config = None
 
         self.fullScreen = True
         self.scale = 2
         self.popPercent = 0.06
-        self.maxNeighbors = 3
+        self.rule = ruleLife.Rule()
         self.screen = None
         self.xmax = 0
         self.ymax = 0
 
-        self.cellLives = None
+        self.colors = None
         self.xborder = self.xmax // self.scale
         self.yborder = self.ymax // self.scale
         self.cols = self.xmax // self.scale
@@ -104,6 +68,7 @@ class Main:
 
         # add margin if needed
         self.margin = 0
+        self.randomSeed = None  # fixed seed for the random styles, None for a new board every run
 
         self.BLACK = (0, 0, 0)
         self.running = False
@@ -111,7 +76,7 @@ class Main:
         self.maxCell = [0, 0]
 
         # font
-        self.font = pygame.font.Font("C:\\Windows\\Fonts\\DejaVuSansMono.ttf", 18)
+        self.font = settings.loadFont(18)
         self.fontColor = (0, 255, 0)
 
         # SEED STYLES
@@ -123,21 +88,55 @@ class Main:
         self.rectangles = False
         self.squares = False
         self.whole = False
+        self.file = False
+        self.patternFile = ''
         self.drawn = False
         self.addToDrawing = False
         self.stats = True
 
         self.settings = None
+        self.engine = None
+        self.renderer = None
+        self.lookahead = 0
+        self.simWorker = None
+        self.dropped = 0
+        self.exitTrigger = threading.Event()
+        self.metrics = metrics.Metrics()
+        self.profiler = metrics.Profiler()
+        self.fastForward = 0
+        self.hashLifeNodes = 1000000
+        self.workers = 0
+        self.cyclePeriod = 30
+        self.autoReseed = False
+        self.cycles = None
+        self.topology = 'clipped'
+        self.viewX = 0  # board cell at the top left of the screen, unbounded topology only
+        self.viewY = 0
+        self.colorCap = 2000000
+        self.fpsCap = 0
+        self.maxSkip = 8
+        self.skip = 0  # generations run without drawing them next frame
+        self.clock = pygame.time.Clock()
+        self.turbo = 1  # generations per displayed frame
+        self.turboAuto = False
+        self.turboFps = 30
+        self.brushSize = 4  # cells painted around the pointer when drawing
+        self.brushShape = 'square'
+        self.checkpoints = None  # writer thread, checkpointing is off without one
+        self.checkpointPath = 'life.ckpt'
+        self.resume = None  # resume from the checkpoint on the first run, read from settings once
 
         self.more_board = None
         self.board = None
         self.count = 0
 
     def updateLoop(self):
-        while True:
+        while not self.exitTrigger.is_set():
             self.settings = settings.Settings(self)
             self.settings.getSettings()
             self.settings.close()
+            if self.exitTrigger.is_set():
+                break
 
             # switch loops
             self.settings.run = False
@@ -154,7 +153,11 @@ class Main:
             styleString = self.config['life']['style']
             if styleString == 'None':
                 styleString = "random"
+            for style in seedLife.styleList:
+                setattr(self, style, False)
+            self.file = False
             setattr(self, styleString, True)
+            self.patternFile = self.config['life']['patternfile']
             showDebugStr = self.config['life']['showdebuginfo']
             self.stats = False
             if showDebugStr == 'True':
@@ -176,363 +179,388 @@ class Main:
             self.cols = self.xmax // self.scale
             self.rows = self.ymax // self.scale
             self.maxCell = [self.screen.get_width(), self.screen.get_height()]
-
-            initial_population = int(self.cols * self.rows * self.popPercent)
+            self.rule = ruleLife.makeRule(self.config['life']['rule'])
+            self.topology = self.config['life']['topology']
+            self.colorCap = int(self.config['life']['colorcap'])
+            self.fpsCap = int(self.config['life']['fpscap'])
+            self.maxSkip = int(self.config['life']['maxskip'])
+            self.turboAuto = self.config['life']['turbo'] == 'auto'
+            self.turbo = 1 if self.turboAuto else max(int(self.config['life']['turbo']), 1)
+            self.turboFps = int(self.config['life']['turbofps'])
+            self.brushSize = int(self.config['life']['brushsize'])
+            self.brushShape = self.config['life']['brushshape']
+            self.checkpointPath = self.config['life']['checkpointpath']
+            if self.resume is None:
+                self.resume = self.config['life']['checkpointresume'] == 'True'
+            if self.checkpoints is not None:
+                self.checkpoints.stop()
+                self.checkpoints = None
+            if int(self.config['life']['checkpointinterval']) > 0:
+                self.checkpoints = checkpointLife.CheckpointWriter(self.checkpointPath,
+                                                                   int(self.config['life']['checkpointinterval']))
+                self.checkpoints.start()
+            if self.topology not in engines.topologyList:
+                print("unknown topology '{}', using 'clipped'".format(self.topology))
+                self.topology = 'clipped'
+            self.fastForward = int(self.config['life']['fastforward'])
+            self.hashLifeNodes = int(self.config['life']['hashlifenodes'])
+            self.workers = int(self.config['life']['workers'])
+            self.lookahead = int(self.config['life']['lookahead'])
+            self.cyclePeriod = int(self.config['life']['cycleperiod'])
+            self.autoReseed = self.config['life']['autoreseed'] == 'True'
+            self.metrics.close()
+            self.metrics = metrics.Metrics(int(self.config['life']['metricswindow']),
+                                           self.config['life']['metricsexport'])
+            self.profiler = metrics.Profiler(int(self.config['life']['profileframes']))
+            if self.engine is not None:
+                self.engine.close()
+            self.engine = engines.makeEngine(self.config['life']['engine'], self)
+            self.renderer = renderLife.makeRenderer(self.config['life']['renderer'], self)
 
             self.more_board = None
             while self.running or self.drawn:
                 self.count = 0
                 # board = set([])
+                if not self.addToDrawing:
+                    self.viewX = self.viewY = 0
 
-                # PATTERN TYPES
-
-                # RANDOM
-                if self.random:
-                    self.board = set((randint(self.margin, self.cols), randint(self.margin, self.rows)) for _ in
-                                     range(initial_population))
-
-                # CIRCLE
-                elif self.circle:
-                    marginO = 80 / self.scale
-                    marginI = 240 / self.scale
-                    self.board = set((randint(self.margin, self.cols), randint(self.margin, self.rows)) for _ in
-                                     range(initial_population))
-                    boardA = putInCircle(self.board, int(self.cols / 4), int(self.rows / 2),
-                                         int(self.rows / 2) - marginO)
-                    boardA = removeFromCircle(boardA, int(self.cols / 4), int(self.rows / 2),
-                                              int(self.rows / 2) - marginI)
-                    boardB = putInCircle(self.board, int(self.cols / 4) * 3, int(self.rows / 2),
-                                         int(self.rows / 2) - marginO)
-                    boardB = removeFromCircle(boardB, int(self.cols / 4) * 3, int(self.rows / 2),
-                                              int(self.rows / 2) - marginI)
-                    self.board = boardA.union(boardB)
-
-                # CIRCLE EDGE
-                elif self.circleEdge:
-                    for i in range(40):
-                        center = int(self.rows / 2 + i * 20), int(self.rows / 2)
-                        radius = int(self.rows / 2 - 100)
-                        it = 5000
-                        inc = (math.pi * 2) / it
-                        angle = float(0)
-                        for _ in range(it):
-                            m = radius
-                            x = int(center[0] + (m * math.cos(angle)))
-                            y = int(center[1] + (m * math.sin(angle)))
-                            self.board.add((x, y))
-                            angle += inc
-
-                # VERTICAL
-                if self.vertical:
-                    self.board = set([])
-                    for row in range(int(self.rows)):
-                        cell = (int(self.cols / 8), row)
-                        self.board.add(cell)
-                    for row in range(int(self.rows)):
-                        cell = (int(self.cols / 8) * 3, row)
-                        self.board.add(cell)
-                    for row in range(int(self.rows)):
-                        cell = (int(self.cols / 8) * 5, row)
-                        self.board.add(cell)
-                    for row in range(int(self.rows)):
-                        cell = (int(self.cols / 8) * 7, row)
-                        self.board.add(cell)
-
-                # HORIZONTAL
-                if self.horizontal:
-                    self.board = set([])
-                    for row in range(32, int(self.rows), 64):
-                        for col in range(int(self.cols)):
-                            cell = (col, row)
-                            self.board.add(cell)
-
-                # RECTANGLES
-                def rectLife(leftR, topR, w, h, ):
-                    for c in range(w):  # top line
-                        cellR = (leftR + c, topR)
-                        self.board.add(cellR)
-
-                    for c in range(w):  # bottom line
-                        cellR = (leftR + c, topR + h)
-                        self.board.add(cellR)
-
-                    for r in range(h):  # left line
-                        cellR = (leftR, topR + r)
-                        self.board.add(cellR)
-
-                    for r in range(h):  # right line
-                        cellR = (leftR + w, topR + r)
-                        self.board.add(cellR)
-
-                # rectangles variation
-                if self.rectangles:
-                    self.board = set([])
-                    self.margin = int(self.rows / 5)
-                    rTop = self.margin
-                    rLeft = self.margin
-                    rW = int(self.cols / 2 - self.margin * 2)
-                    rH = int(self.margin)
-
-                    rectLife(rLeft, rTop, rW, rH)  # top left
-                    rTopBot = self.margin * 3
-                    rectLife(rLeft, rTopBot, rW, rH)  # bottom left
-                    rLeftRight = self.cols / 2 + self.margin
-                    rectLife(rLeftRight, rTopBot, rW, rH)  # bottom right
-                    rectLife(rLeftRight, rTop, rW, rH)  # top right
-
-                # squares variation
-                if self.squares:
-                    self.board = set([])
-                    self.margin = int(self.rows / 5)
-                    rTop = self.margin
-                    rLeft = self.margin / 2
-                    rW = self.margin
-                    rH = self.margin
-
-                    rectLife(rLeft, rTop, rW, rH)  # top 1
-                    rL2 = rLeft + self.margin * 2
-                    rectLife(rL2, rTop, rW, rH)  # top 2
-                    rL3 = rLeft + self.margin * 4
-                    rectLife(rL3, rTop, rW, rH)  # top 3
-                    rL4 = rLeft + self.margin * 6
-                    rectLife(rL4, rTop, rW, rH)  # top 4
-                    rL5 = rLeft + self.margin * 8
-                    rectLife(rL5, rTop, rW, rH)  # top 5
-                    rL6 = rLeft + self.margin * 10
-                    rectLife(rL6, rTop, rW, rH)  # top 6
-                    t2 = self.margin * 3
-                    rectLife(rLeft, t2, rW, rH)  # bottom 7
-                    rectLife(rL2, t2, rW, rH)  # bottom 8
-                    rectLife(rL3, t2, rW, rH)  # bottom 9
-                    rectLife(rL4, t2, rW, rH)  # bottom 10
-                    rectLife(rL5, t2, rW, rH)  # bottom 11
-                    rectLife(rL6, t2, rW, rH)  # bottom 12
-
-                # WHOLE
-                if self.whole:
-                    self.board = set([])
-                    rectLife(int(self.cols / 2 - self.rows / 2), 0, int(self.rows),
-                             int(self.rows))  # - (self.scale * 1)
+                resumed = False
+                with self.metrics.timer('seed'):
+                    if self.resume and not self.drawn:
+                        resumed = self.resumeCheckpoint()
+                    self.resume = False
+                    if not resumed:
+                        self.seed()
 
                 # DRAWN
                 if self.drawn:
                     if self.addToDrawing:
                         self.addToDrawing = False
                         self.more_board = drawLife.getDrawing(self, True)
+                        if self.topology == 'unbounded':
+                            self.more_board = set((x + self.viewX, y + self.viewY) for x, y in self.more_board)
                         temp_board = self.board.copy()
                         self.board = temp_board.union(self.more_board)
                     else:
                         self.board = set([])
                         self.board = drawLife.getDrawing(self, False)
-                    if len(self.board) < 100:
-                        break
                     if self.board is None:
                         continue
+                    if len(self.board) < 100:
+                        break
                     self.running = True
                     self.screen.fill(self.BLACK)
 
-                self.board = self.iterate(self.board)
+                with self.metrics.timer('seed'):
+                    if not resumed:
+                        # precompute where the seed ends up before drawing it
+                        if self.fastForward > 0:
+                            if self.topology != 'unbounded':
+                                # hashlife has no border or torus, step the engine instead
+                                self.board = self.iterate(self.board, self.fastForward)
+                            else:
+                                self.board = hashLife.fastForward(self.board, self.fastForward, self.hashLifeNodes,
+                                                                  self.rule)
+                            self.count = self.fastForward
+
+                        self.board = self.iterate(self.board)
+
+                        # cell entropy
+                        self.addColorEntropy(self.board)
+
+                    self.resetCycles()
+                self.renderer.invalidate()
+
+                # simulation runs ahead on its own thread
+                self.dropped = 0
+                self.skip = 0
+                if self.lookahead > 0:
+                    self.simWorker = pipeline.SimWorker(self, self.board, self.lookahead)
+                    self.simWorker.start()
 
-                # cell entropy
-                self.addColorEntropy(self.board)
-
-                done = 0
                 while True:
-                    if self.running is False or self.addToDrawing:
+                    if self.exitTrigger.is_set():
+                        self.running = False
+                        self.drawn = False
+                    if self.pollEvents():
                         break
-                    self.screen.fill(self.BLACK)
-
+                    frameStart = time.perf_counter()
                     startD = time.time()
-                    for x, y in self.board:
-                        if self.drawn:
-                            for evt in pygame.event.get():
-                                print(evt.type)
-                                if evt.type == pygame.MOUSEBUTTONDOWN:
-                                    self.addToDrawing = True
-                                    break
-                                if evt.type == 768:  # tcod key down - quit to settings
-                                    self.running = False
-                                    self.drawn = False
-                                    break
-                        if self.addToDrawing:
-                            break
-                        if pyGameExit() is True:
-                            self.running = False
-                            break
-                        if self.running is False:
-                            break
-
-                        # glider = isGlider(x, y)
-                        keyStr = keyStrGen(x, y)
-                        if keyStr in self.cellLives:
-                            cellLife = self.cellLives[keyStr]
-                        else:
-                            cellLife = CellLife()
-                            self.cellLives[keyStr] = cellLife
-                        left = x * self.scale
-                        top = y * self.scale
-                        pygame.draw.rect(self.screen, cellLife.clr, (left, top, self.scale, self.scale))
-                        if cellLife.decay():
-                            done += 1
-                        else:
-                            done = 0
-                        self.cellLives[keyStr] = cellLife
+                    with self.metrics.timer('draw'):
+                        self.renderer.clear()
+                        xs, ys = self.view(self.board)
+                        self.renderer.draw(xs, ys, self.colors.colors(xs, ys))
+                    with self.metrics.timer('decay'):
+                        # in turbo the generations between displayed ones age the cells in one go
+                        done = self.colors.decayCells(xs, ys, self.turbo)
+                        period = None
+                        if self.cycles is not None:
+                            # the whole board, an unbounded one repeats off screen too
+                            period = self.cycles.update(*engines.boardArrays(self.board), self.count)
 
                     endD = time.time() - startD
 
                     startI = time.time()
-                    self.board = self.iterate(self.board)
-                    endI = time.time() - startI
-                    self.count += 1
+                    if self.simWorker is None:
+                        gens = self.turbo
+                        with self.metrics.timer('iterate'):
+                            if self.cycles is None or gens == 1:
+                                self.board = self.iterate(self.board, gens)
+                            else:
+                                # one generation at a time so every one is hashed and periods come out exact
+                                for i in range(1, gens + 1):
+                                    self.board = self.iterate(self.board)
+                                    if i < gens:
+                                        period = self.cycles.update(*engines.boardArrays(self.board),
+                                                                    self.count + i)
+                        endI = time.time() - startI
+                    else:
+                        # keep the display alive while the worker catches up, unless it has stopped
+                        nextGen = self.simWorker.get()
+                        while (nextGen is None and self.simWorker.is_alive() and not self.exitTrigger.is_set()
+                               and not self.pollEvents()):
+                            self.dropped += 1
+                            nextGen = self.simWorker.get()
+                        if nextGen is None:
+                            if self.exitTrigger.is_set():
+                                self.running = False
+                                self.drawn = False
+                            break
+                        self.board, endI, gens = nextGen
+                        self.metrics.add('iterate', endI)
+                        if gens > 1 and self.cycles is not None:
+                            # the worker's boards are gens apart, a repeat between them says nothing of
+                            # the period, so start over rather than claim one
+                            self.resetCycles()
+                    self.count += gens
+
+                    # behind the frame rate cap, generations the display can't keep up with are run undrawn
+                    for _ in range(self.skip if self.simWorker is None else 0):
+                        with self.metrics.timer('decay'):
+                            skipXs, skipYs = self.view(self.board)
+                            self.colors.decayCells(skipXs, skipYs)
+                            if self.cycles is not None:
+                                period = self.cycles.update(*engines.boardArrays(self.board), self.count)
+                        with self.metrics.timer('iterate'):
+                            self.board = self.iterate(self.board)
+                        self.count += 1
 
                     # STATS
+                    hud = []
                     if self.stats:
-                        text = self.font.render("Draw:  {:.4f}".format(endD), True, self.fontColor)
-                        textPos = text.get_rect(topleft=(8, 8))
-                        self.screen.blit(text, textPos)
-                        text = self.font.render("Iter:  {:.4f}".format(endI), True, self.fontColor)
-                        textPos = text.get_rect(topleft=(8, 24))
-                        self.screen.blit(text, textPos)
-                        text = self.font.render("Cells: {}".format(len(self.board)), True, self.fontColor)
-                        textPos = text.get_rect(topleft=(8, 42))
-                        self.screen.blit(text, textPos)
-                        text = self.font.render("Count: {}".format(self.count), True, self.fontColor)
-                        textPos = text.get_rect(topleft=(8, 58))
-                        self.screen.blit(text, textPos)
-                    pygame.display.flip()
-
-                    if done >= len(self.board):
+                        lines = ["Draw:  {:.4f}".format(endD),
+                                 "Iter:  {:.4f}".format(endI),
+                                 "Cells: {}".format(len(self.board)),
+                                 "Count: {}".format(self.count),
+                                 "Color: {} cells {} KiB".format(self.colors.entries(), self.colors.nbytes() // 1024)]
+                        if self.topology == 'unbounded':
+                            lines[-1] += " evicted {}".format(self.colors.evicted)
+                        if self.engine.cellsEvaluated is not None:
+                            lines.append("Eval:  {} cells {} tiles".format(self.engine.cellsEvaluated,
+                                                                          self.engine.tilesEvaluated))
+                        if self.topology == 'unbounded':
+                            lines.append("View:  {}, {}".format(self.viewX, self.viewY))
+                        if period is not None:
+                            lines.append("Cycle: period {} from {}".format(period, self.cycles.start))
+                        if self.turbo > 1 or self.turboAuto:
+                            lines.append("Turbo: {} gens/frame{}".format(self.turbo,
+                                                                         " auto" if self.turboAuto else ""))
+                        if self.fpsCap > 0:
+                            lines.append("FPS:   {:.1f} cap {} skip {}".format(self.clock.get_fps(), self.fpsCap,
+                                                                        self.skip))
+                        if self.simWorker is not None:
+                            lines.append("Queue: {}/{} dropped {}".format(self.simWorker.depth(), self.lookahead,
+                                                                         self.dropped))
+                        for name in metrics.phaseList:
+                            p = self.metrics.percentiles(name)
+                            if p is not None:
+                                lines.append("{:<7}p50 {:.1f} p95 {:.1f} p99 {:.1f} ms".format(
+                                    name, p[0] * 1000, p[1] * 1000, p[2] * 1000))
+                        hud = self.drawStats(lines)
+                    with self.metrics.timer('flip'):
+                        self.renderer.present(hud)
+                    frameTime = time.perf_counter() - frameStart
+                    genTime = self.metrics.frameTime('iterate', 'decay')
+                    if self.turboAuto:
+                        self.turbo = self.turboFor(frameTime, genTime, gens)
+                    if self.fpsCap > 0:
+                        if self.turbo == 1 and not self.turboAuto:
+                            self.skip = self.skipFor(frameTime, genTime, self.skip + 1)
+                        else:
+                            self.skip = 0
+                        self.clock.tick(self.fpsCap)
+                    self.metrics.endFrame(self.count, len(self.board))
+                    self.profiler.endFrame()
+                    if self.checkpoints is not None and self.checkpoints.due():
+                        self.checkpoints.offer(checkpointLife.snapshot(self))
+
+                    if done >= len(xs) or (period is not None and self.autoReseed):
                         self.screen.fill(self.BLACK)
                         pygame.display.flip()
                         break
+
+                if self.simWorker is not None:
+                    self.simWorker.stop()
+                    self.simWorker = None
             self.screen = None
             self.running = False
-
-    def iterate(self, board):
-        new_board = set([])
-        candidates = board.union(set(n for cell in board for n in neighbors(cell)))
-        for cell in candidates:
-            x, y = cell
-            if x > self.xborder or y > self.yborder:
-                continue
-            if x < 0 or y < 0:
-                continue
-
-            count = sum((n in board) for n in neighbors(cell))
-            if count == self.maxNeighbors or (count == 2 and cell in board):
-                new_board.add(cell)
-
-            # insert new cellLife in new board if needed
-            keyStr = keyStrGen(x, y)
-            if self.cellLives is not None:
-                if keyStr in self.cellLives:
-                    pass
-                else:
-                    self.cellLives[keyStr] = CellLife()
-
-        return new_board
-
-    def addColorEntropy(self, brd):
-        self.cellLives = dict()
-        for x, y in brd:
-            if keyStrGen(x, y) in self.cellLives is False:
-                self.cellLives[str(x) + "," + str(y)] = CellLife()
-
-
-class CellLife:
-    def __init__(self):
-        self.clr = [70, 0, 0]
-        self.maxIntensity = 255
-        self.rState = 1
-        self.gState = 0
-        self.bState = 0
-
-        self.rStateUp = 1
-        self.rStateStay = 2
-        self.rStateFall = 3
-        self.rPeaked = False
-        self.rPeakVal = 255
-        self.rStay = False
-        self.rDone = False
-
-        self.gStart = False
-        self.gStartVal = 25
-        self.gPeaked = False
-        self.gPeakVal = 150
-        self.gStateUp = 1
-        self.gStateFall = 3
-        self.bPeaked = False
-        self.gDone = False
-
-        self.bStart = False
-        self.bStartVal = 0
-        self.bStateUp = 1
-        self.bPeak = 254
-        self.bStateFall = 3
-        self.bEndVal = 90
-
-        self.decayed = False
-
-    def reset(self):
-        self.__init__()
-
-    def decay(self):
-        if self.clr == [self.maxIntensity - 1, self.maxIntensity - 1, self.maxIntensity - 1]:  # last gasp flash
-            self.clr = [0, 0, self.bEndVal]
-            self.decayed = True
-        if self.decayed:
+        if self.checkpoints is not None:
+            self.checkpoints.stop()
+
+    def seed(self):
+        # build self.board for the selected seed style, straight into the engine
+        for style in seedLife.styleList:
+            if getattr(self, style):
+                xs, ys = seedLife.generate(style, self.cols, self.rows, self.popPercent, self.scale, self.margin,
+                                           self.randomSeed)
+                self.board = self.engine.seed(xs, ys)
+        if self.file:
+            try:
+                xs, ys, rule = patternLife.load(self.patternFile, self.hashLifeNodes)
+            except (OSError, ValueError) as e:
+                print("can't load pattern '{}': {}, using random".format(self.patternFile, e))
+                xs, ys = seedLife.generate('random', self.cols, self.rows, self.popPercent, self.scale,
+                                           self.margin, self.randomSeed)
+            else:
+                if rule is not None and rule != self.rule.text:
+                    print("pattern '{}' is for rule {}, running {}".format(self.patternFile, rule, self.rule.text))
+                xs, ys = patternLife.center(xs, ys, self.cols, self.rows)
+            self.board = self.engine.seed(xs, ys)
+
+    def resumeCheckpoint(self):
+        # carry on the run saved at checkpointPath, False when there is none for this board
+        if not os.path.exists(self.checkpointPath):
+            return False
+        try:
+            state = checkpointLife.load(self.checkpointPath)
+        except (OSError, ValueError) as e:
+            print("can't resume from '{}': {}".format(self.checkpointPath, e))
+            return False
+        if (state.age.shape != (self.yborder + 1, self.xborder + 1) or state.topology != self.topology
+                or state.rule != self.rule.text):
+            print("checkpoint '{}' is for a different board ({}x{} {} {}), starting fresh".format(
+                self.checkpointPath, state.age.shape[1], state.age.shape[0], state.topology, state.rule))
+            return False
+        self.board = self.engine.seed(*state.arrays())
+        self.count = state.count
+        self.viewX, self.viewY = state.viewX, state.viewY
+        self.addColorEntropy(self.board)
+        state.restore(self.colors)
+        return True
+
+    def drawStats(self, lines):
+        # stats HUD in the top left corner, returns the screen areas it covers
+        rects = []
+        for i, line in enumerate(lines):
+            text = self.font.render(line, True, self.fontColor)
+            textPos = text.get_rect(topleft=(8, 8 + i * 16))
+            rects.append(self.screen.blit(text, textPos))
+        return rects
+
+    def keyDown(self, key):
+        # run time keys, True when the key was used
+        if key == pygame.K_p:
+            self.profiler.start()
+            return True
+        if key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+            self.turbo = min(self.turbo * 2, self.maxTurbo)
+            self.turboAuto = False
+            return True
+        if key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.turbo = max(self.turbo // 2, 1)
+            self.turboAuto = False
+            return True
+        if key == pygame.K_t:
+            self.turboAuto = not self.turboAuto
             return True
+        if key == pygame.K_s:
+            path = "life-{}.rle".format(time.strftime("%Y%m%d-%H%M%S"))
+            patternLife.save(path, self.board, self.rule.text)
+            print("board written to {}".format(path))
+            return True
+        if key in panKeys and self.topology == 'unbounded':
+            dx, dy = panKeys[key]
+            self.pan(dx * max(self.cols // 8, 1), dy * max(self.rows // 8, 1))
+            return True
+        return False
+
+    def skipFor(self, frameTime, genTime, gens):
+        # Generations to run undrawn next frame so the board keeps pace with
+        # fpsCap. Drawing costs frameTime - genTime once a frame, stepping
+        # genTime / gens per generation, so g generations a frame fit the
+        # budget once draw + g * perGen <= g * budget.
+        budget = 1 / self.fpsCap
+        perGen = genTime / gens
+        if frameTime <= budget or perGen >= budget:
+            return 0
+        gensPerFrame = -(-(frameTime - genTime) // (budget - perGen))
+        return int(min(gensPerFrame - 1, self.maxSkip))
+
+    def turboFor(self, frameTime, genTime, gens):
+        # generations per frame that hold turboFps, moving half way there
+        # each frame so a noisy frame doesn't swing it
+        budget = 1 / self.turboFps
+        perGen = max(genTime / gens, 1e-6)
+        fits = (budget - (frameTime - genTime)) // perGen
+        target = int(max(1, min(fits, self.maxTurbo)))
+        return max(1, (self.turbo + target) // 2)
+
+    def pan(self, dx, dy):
+        # move the viewport over an unbounded board, colours move with their cells
+        self.viewX += dx
+        self.viewY += dy
+        self.colors.shift(dx, dy)
+        self.renderer.invalidate()
+
+    def view(self, board):
+        # the cells on screen as x and y index arrays
+        xs, ys = engines.boardArrays(board)
+        if self.topology == 'unbounded':
+            xs, ys = xs - self.viewX, ys - self.viewY
+            inside = (xs >= 0) & (ys >= 0) & (xs <= self.xborder) & (ys <= self.yborder)
+            xs, ys = xs[inside], ys[inside]
+        return xs, ys
+
+    def resetCycles(self):
+        self.cycles = None
+        if self.cyclePeriod > 0:
+            self.cycles = cycleLife.CycleDetector(self.cyclePeriod)
+
+    def dispatch(self, event):
+        if event.type == pygame.KEYDOWN:
+            if self.keyDown(event.key):
+                return
+            if event.key == pygame.K_ESCAPE:
+                self.running = False
+            if self.drawn:  # any key on a drawing quits to settings
+                self.running = False
+                self.drawn = False
+        elif event.type == pygame.MOUSEBUTTONDOWN and self.drawn:
+            self.addToDrawing = True
+
+    def pollEvents(self):
+        # one pass over the event queue per frame, True when the frame loop should stop
+        with self.metrics.timer('events'):
+            for event in pygame.event.get():
+                self.dispatch(event)
+        return self.running is False or self.addToDrawing
+
+    def iterate(self, board, generations=1):
+        if generations > 1:
+            return self.engine.iterateMany(board, generations)
+        return self.engine.iterate(board)
 
-        decInc = 2
-
-        # RED
-        if self.rState == self.rStateUp:
-            if self.clr[0] < self.maxIntensity:
-                self.clr[0] += decInc
-            if self.clr[0] >= self.rPeakVal:
-                self.rState = self.rStateStay
-                self.gState = self.gStateUp
-        elif self.rState == self.rStateFall and self.clr[0] > 0:
-            self.clr[0] -= decInc
-            if self.clr[0] <= 0:
-                self.rState = 0
-                self.clr = [0, 0, 70]
-                self.bState = self.bStateUp
-
-        # GREEN
-        if self.gState == self.gStateUp:
-            if self.clr[1] < self.maxIntensity:
-                self.clr[1] += decInc
-            if self.clr[1] >= self.gPeakVal:
-                self.gState = self.gStateFall
-                self.rState = self.rStateFall
-        elif self.clr[1] > 0:
-            self.clr[1] -= decInc * 2
-            if self.clr[1] <= 0:
-                self.gDone = 0
-
-        # BLUE
-        if self.bState == self.bStateUp:
-            if self.clr[2] < self.maxIntensity:
-                self.clr[2] += decInc
-            if self.clr[2] >= self.bPeak:
-                self.bState = self.bStateFall
-        elif self.bState == self.bStateFall:
-            self.clr[2] -= decInc
-            if self.clr[2] == self.bEndVal + decInc:
-                # flash before decayed completely
-                # [self.maxIntensity, self.maxIntensity, self.maxIntensity]
-                # is reserved for special entities like spawned spaceships
-                self.clr = [self.maxIntensity - 1, self.maxIntensity - 1, self.maxIntensity - 1]
-        self.clr[0] = clamp(0, self.maxIntensity, self.clr[0])
-        self.clr[1] = clamp(0, self.maxIntensity, self.clr[1])
-        self.clr[2] = clamp(0, self.maxIntensity, self.clr[2])
-
-        return self.decayed
+    def addColorEntropy(self, brd):
+        # fresh colour state for every cell on the board
+        if self.topology == 'unbounded':
+            self.colors = colorLife.WorldColorStore((self.yborder + 1, self.xborder + 1), self.colorCap)
+        else:
+            self.colors = colorLife.ColorStore((self.yborder + 1, self.xborder + 1))
 
 
 def main(exit_trigger):
     life = Main()
+    life.exitTrigger = exit_trigger
     # while True:
     life.updateLoop()
 
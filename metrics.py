@@ -0,0 +1,109 @@
+import cProfile
+import csv
+import json
+import time
+from collections import deque
+import numpy as np
+
+phaseList = ['seed', 'iterate', 'decay', 'draw', 'events', 'flip']
+
+
+class Timer:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add(self.name, time.perf_counter() - self.start)
+
+
+class Metrics:
+    # Named phase timers. Each phase keeps a rolling window of per generation
+    # times for percentiles and a running total, and every generation can be
+    # written out as a CSV or JSONL row.
+    def __init__(self, window=300, exportPath=''):
+        self.samples = dict((name, deque(maxlen=window)) for name in phaseList)
+        self.totals = dict((name, 0.0) for name in phaseList)
+        self.current = dict()
+        self.exportPath = exportPath
+        self.exportFile = None
+        self.writer = None
+
+    def timer(self, name):
+        return Timer(self, name)
+
+    def add(self, name, seconds):
+        # phases timed more than once in a generation add up
+        self.current[name] = self.current.get(name, 0.0) + seconds
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+    def frameTime(self, *names):
+        # seconds spent in the named phases so far this generation
+        return sum(self.current.get(name, 0.0) for name in names)
+
+    def endFrame(self, generation, population):
+        for name, seconds in self.current.items():
+            self.samples.setdefault(name, deque(maxlen=self.samples['iterate'].maxlen)).append(seconds)
+        if self.exportPath:
+            self.export(generation, population)
+        self.current = dict()
+
+    def percentiles(self, name):
+        # p50, p95, p99 of the rolling window in seconds
+        samples = self.samples.get(name)
+        if not samples:
+            return None
+        return tuple(np.percentile(samples, (50, 95, 99)).tolist())
+
+    def export(self, generation, population):
+        row = dict(generation=generation, population=population)
+        for name in phaseList:
+            row[name] = self.current.get(name, 0.0)
+        if self.exportFile is None:
+            self.exportFile = open(self.exportPath, 'w', newline='')
+            if self.exportPath.endswith('.csv'):
+                self.writer = csv.DictWriter(self.exportFile, fieldnames=list(row))
+                self.writer.writeheader()
+        if self.writer is not None:
+            self.writer.writerow(row)
+        else:
+            self.exportFile.write(json.dumps(row) + '\n')
+
+    def close(self):
+        if self.exportFile is not None:
+            self.exportFile.close()
+            self.exportFile = None
+            self.writer = None
+
+
+class Profiler:
+    # cProfile capture of the next few frames of the render thread, started
+    # from a key press and dumped to a .prof file for pstats/snakeviz
+    def __init__(self, frames=300):
+        self.frames = frames
+        self.left = 0
+        self.profile = None
+
+    def start(self):
+        if self.profile is not None:
+            return
+        print("profiling {} frames".format(self.frames))
+        self.left = self.frames
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def endFrame(self):
+        if self.profile is None:
+            return
+        self.left -= 1
+        if self.left <= 0:
+            self.profile.disable()
+            path = "life-{}.prof".format(time.strftime("%Y%m%d-%H%M%S"))
+            self.profile.dump_stats(path)
+            print("profile written to {}".format(path))
+            self.profile = None
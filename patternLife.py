@@ -0,0 +1,268 @@
+"""
+Pattern files: RLE (.rle), plaintext (.cells) and macrocell (.mc).
+
+Files are read a line at a time and only runs of live cells are kept while
+parsing, so large patterns load without the whole file or a per cell list
+held in memory. Formats as described on https://conwaylife.com/wiki
+"""
+
+import re
+import time
+from array import array
+import numpy as np
+import hashLife
+
+rleToken = re.compile(r'\d+|[^\d\s]')
+liveRun = re.compile(r'[O*]+')
+
+
+def expandRuns(runX, runY, runN):
+    # x and y arrays from runs of n live cells starting at (x, y)
+    runX = np.frombuffer(runX, dtype=np.int64)
+    runY = np.frombuffer(runY, dtype=np.int64)
+    runN = np.frombuffer(runN, dtype=np.int64)
+    starts = np.cumsum(runN) - runN
+    step = np.arange(int(runN.sum())) - np.repeat(starts, runN)
+    return np.repeat(runX, runN) + step, np.repeat(runY, runN)
+
+
+def readRle(lines):
+    rule = None
+    header = True
+    x = y = 0
+    count = ''
+    runX, runY, runN = array('q'), array('q'), array('q')
+    for line in lines:
+        if header:
+            text = line.strip()
+            if not text or text.startswith('#'):
+                continue
+            header = False
+            if text.startswith('x'):  # x = 3, y = 3, rule = B3/S23
+                for part in text.split(','):
+                    key, _, value = part.partition('=')
+                    if key.strip() == 'rule':
+                        rule = value.strip()
+                continue
+        for token in rleToken.findall(line):
+            if token.isdigit():
+                count += token  # a count can be split over two lines
+                continue
+            n = int(count) if count else 1
+            count = ''
+            if token == '!':
+                return expandRuns(runX, runY, runN) + (rule,)
+            if token == '$':
+                y += n
+                x = 0
+            elif token in 'b.':
+                x += n
+            else:  # o, or any other state of a multi state rule
+                runX.append(x)
+                runY.append(y)
+                runN.append(n)
+                x += n
+    return expandRuns(runX, runY, runN) + (rule,)
+
+
+def readCells(lines):
+    runX, runY, runN = array('q'), array('q'), array('q')
+    y = 0
+    for line in lines:
+        if line.startswith('!'):
+            continue
+        for run in liveRun.finditer(line):
+            runX.append(run.start())
+            runY.append(y)
+            runN.append(run.end() - run.start())
+        y += 1
+    return expandRuns(runX, runY, runN) + (None,)
+
+
+def leafNode(universe, rows, x, y, size):
+    # node for the size x size square at (x, y) of a leaf's rows of '.'/'*'
+    if size == 1:
+        row = rows[y] if y < len(rows) else ''
+        return hashLife.on if x < len(row) and row[x] == '*' else hashLife.off
+    half = size // 2
+    return universe.join(leafNode(universe, rows, x, y, half), leafNode(universe, rows, x + half, y, half),
+                         leafNode(universe, rows, x, y + half, half),
+                         leafNode(universe, rows, x + half, y + half, half))
+
+
+def quadtreeRuns(root):
+    # live cells of a quadtree as runs, walked without a per cell list. Each
+    # node's quadrants are visited nw, ne, sw, se, so cells next to each
+    # other in the walk on the same row join one run
+    runX, runY, runN = array('q'), array('q'), array('q')
+    stack = [(root, 0, 0)]
+    while stack:
+        node, x, y = stack.pop()
+        if node.n == 0:
+            continue
+        if node.k == 0:
+            if runN and runY[-1] == y and runX[-1] + runN[-1] == x:
+                runN[-1] += 1
+            else:
+                runX.append(x)
+                runY.append(y)
+                runN.append(1)
+            continue
+        half = 1 << (node.k - 1)
+        stack.append((node.se, x + half, y + half))
+        stack.append((node.sw, x, y + half))
+        stack.append((node.ne, x + half, y))
+        stack.append((node.nw, x, y))
+    return expandRuns(runX, runY, runN)
+
+
+def readMacrocell(lines, maxNodes=1000000):
+    # nodes are numbered from 1 in file order, 0 is an empty node, the last
+    # one is the root. Leaves are 8x8 squares written as rows of . and *
+    rule = None
+    universe = hashLife.HashLife(maxNodes)
+    nodes = [None]
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('['):
+            continue
+        if line.startswith('#'):
+            if line.startswith('#R'):
+                rule = line[2:].strip()
+            continue
+        if line[0] in '.*$':
+            nodes.append(leafNode(universe, line.split('$'), 0, 0, 8))
+            continue
+        k, nw, ne, sw, se = map(int, line.split())
+        zero = universe.zero(k - 1)
+        nodes.append(universe.join(*(nodes[i] if i else zero for i in (nw, ne, sw, se))))
+    if len(nodes) == 1:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), rule
+    return quadtreeRuns(nodes[-1]) + (rule,)
+
+
+def sortedCells(cells):
+    # x and y arrays moved to the origin and sorted by row, then column
+    xy = np.array([(int(x), int(y)) for x, y in cells], dtype=np.int64).reshape(-1, 2)
+    xy -= xy.min(axis=0) if len(xy) else 0
+    order = np.lexsort((xy[:, 0], xy[:, 1]))
+    return xy[order, 0], xy[order, 1]
+
+
+def writeRle(out, cells, rule):
+    xs, ys = sortedCells(cells)
+    w = int(xs.max()) + 1 if len(xs) else 0
+    h = int(ys.max()) + 1 if len(ys) else 0
+    out.write("x = {}, y = {}, rule = {}\n".format(w, h, rule))
+
+    # a run ends wherever the next live cell is not the next one along
+    gap = np.ones(len(xs), dtype=bool)
+    gap[1:] = (ys[1:] != ys[:-1]) | (xs[1:] != xs[:-1] + 1)
+    starts = np.flatnonzero(gap)
+    lengths = np.diff(np.append(starts, len(xs)))
+
+    line = ''
+    x = y = 0
+    for start, n in zip(starts.tolist(), lengths.tolist()):
+        tokens = []
+        if ys[start] > y:
+            tokens.append(runToken(int(ys[start]) - y, '$'))
+            y, x = int(ys[start]), 0
+        if xs[start] > x:
+            tokens.append(runToken(int(xs[start]) - x, 'b'))
+        tokens.append(runToken(n, 'o'))
+        x = int(xs[start]) + n
+        for token in tokens:
+            if len(line) + len(token) > 70:
+                out.write(line + '\n')
+                line = ''
+            line += token
+    out.write(line + '!\n')
+
+
+def runToken(n, tag):
+    return tag if n == 1 else '{}{}'.format(n, tag)
+
+
+def writeCells(out, cells):
+    xs, ys = sortedCells(cells)
+    out.write("!Name: gameOfLife {}\n".format(time.strftime("%Y-%m-%d %H:%M:%S")))
+    row = []
+    y = 0
+    for x, cy in zip(xs.tolist(), ys.tolist()):
+        if cy != y:
+            out.write(''.join(row) + '\n' * (cy - y))
+            row, y = [], cy
+        row.extend('.' * (x - len(row)))
+        row.append('O')
+    out.write(''.join(row) + '\n')
+
+
+def leafRows(node, rows, x, y):
+    if node.n == 0:
+        return
+    if node.k == 0:
+        rows[y][x] = '*'
+        return
+    half = 1 << (node.k - 1)
+    leafRows(node.nw, rows, x, y)
+    leafRows(node.ne, rows, x + half, y)
+    leafRows(node.sw, rows, x, y + half)
+    leafRows(node.se, rows, x + half, y + half)
+
+
+def writeMacrocell(out, cells, rule):
+    universe = hashLife.HashLife()
+    universe.setCells(cells)
+    out.write("[M2] (gameOfLife)\n#R {}\n".format(rule))
+    index = dict()
+
+    def write(node):
+        # children before parents, each distinct node once
+        if node.n == 0:
+            return 0
+        if node in index:
+            return index[node]
+        if node.k == 3:
+            rows = [['.'] * 8 for _ in range(8)]
+            leafRows(node, rows, 0, 0)
+            text = [''.join(row).rstrip('.') for row in rows]
+            while text and not text[-1]:
+                text.pop()
+            out.write(''.join(row + '$' for row in text) + '\n')
+        else:
+            children = [write(child) for child in (node.nw, node.ne, node.sw, node.se)]
+            out.write("{} {} {} {} {}\n".format(node.k, *children))
+        index[node] = len(index) + 1
+        return index[node]
+
+    write(universe.root)
+
+
+def load(path, maxNodes=1000000):
+    # x, y arrays and the rule named in the file, if it names one
+    with open(path) as f:
+        if path.lower().endswith('.mc'):
+            return readMacrocell(f, maxNodes)
+        if path.lower().endswith(('.cells', '.txt')):
+            return readCells(f)
+        return readRle(f)
+
+
+def save(path, cells, rule):
+    with open(path, 'w') as out:
+        if path.lower().endswith('.mc'):
+            writeMacrocell(out, cells, rule)
+        elif path.lower().endswith(('.cells', '.txt')):
+            writeCells(out, cells)
+        else:
+            writeRle(out, cells, rule)
+
+
+def center(xs, ys, cols, rows):
+    # move a loaded pattern to the middle of a cols x rows board
+    if len(xs) == 0:
+        return xs, ys
+    dx = (cols - int(xs.max()) - int(xs.min())) // 2
+    dy = (rows - int(ys.max()) - int(ys.min())) // 2
+    return xs + dx, ys + dy
@@ -0,0 +1,48 @@
+import queue
+import threading
+import time
+
+
+class SimWorker(threading.Thread):
+    # Computes generations ahead of the display into a bounded queue. The
+    # render loop takes one generation per frame, the worker blocks once it is
+    # lookahead generations ahead.
+    def __init__(self, life, board, lookahead, wait=1 / 60):
+        super().__init__(daemon=True)
+        self.life = life
+        self.board = board
+        self.frames = queue.Queue(maxsize=lookahead)
+        self.wait = wait  # how long the render loop waits for a generation
+        self.stopped = threading.Event()
+
+    def running(self):
+        return not (self.stopped.is_set() or self.life.exitTrigger.is_set())
+
+    def run(self):
+        board = self.board
+        while self.running():
+            start = time.time()
+            generations = self.life.turbo
+            board = self.life.iterate(board, generations)
+            item = (board, time.time() - start, generations)
+            while self.running():
+                try:
+                    self.frames.put(item, timeout=self.wait)
+                    break
+                except queue.Full:
+                    pass
+
+    def get(self):
+        # next board, the time it took and how many generations on it is,
+        # None if it is not ready yet
+        try:
+            return self.frames.get(timeout=self.wait)
+        except queue.Empty:
+            return None
+
+    def depth(self):
+        return self.frames.qsize()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
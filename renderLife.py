@@ -0,0 +1,153 @@
+import numpy as np
+import pygame
+
+
+class Renderer:
+    # clear() starts a frame, draw() paints the live cells and present()
+    # puts the frame on the display together with the HUD areas drawn on top
+    name = None
+
+    def __init__(self, life):
+        self.life = life
+
+    def clear(self):
+        self.life.screen.fill(self.life.BLACK)
+
+    def draw(self, xs, ys, clrs):
+        raise NotImplementedError
+
+    def present(self, overlay):
+        pygame.display.flip()
+
+    def invalidate(self):
+        # something other than the renderer painted the screen
+        pass
+
+
+class RectRenderer(Renderer):
+    # one pygame.draw.rect per live cell
+    name = 'rect'
+
+    def draw(self, xs, ys, clrs):
+        scale = self.life.scale
+        for x, y, clr in zip(xs.tolist(), ys.tolist(), clrs.tolist()):
+            # glider = isGlider(x, y)
+            left = x * scale
+            top = y * scale
+            pygame.draw.rect(self.life.screen, clr, (left, top, scale, scale))
+
+
+class SurfRenderer(Renderer):
+    # The generation is written into an RGB array at board resolution, pushed
+    # to a board sized surface in one surfarray blit and scaled up to the
+    # screen in one go.
+    name = 'surfarray'
+
+    def __init__(self, life):
+        super().__init__(life)
+        w, h = life.xborder + 1, life.yborder + 1
+        self.pixels = np.zeros((w, h, 3), dtype=np.uint8)  # surfarray is indexed [x, y]
+        self.surface = pygame.Surface((w, h))
+        self.scaled = None
+        if life.scale > 1:
+            self.scaled = pygame.Surface((w * life.scale, h * life.scale))
+
+    def draw(self, xs, ys, clrs):
+        self.pixels.fill(0)
+        self.pixels[xs, ys] = clrs
+        pygame.surfarray.blit_array(self.surface, self.pixels)
+        if self.scaled is None:
+            self.life.screen.blit(self.surface, (0, 0))
+        else:
+            pygame.transform.scale(self.surface, self.scaled.get_size(), self.scaled)
+            self.life.screen.blit(self.scaled, (0, 0))
+
+
+class DirtyRenderer(Renderer):
+    # Keeps a board resolution copy of what is on screen and only repaints
+    # cells whose colour changed: births, deaths and palette steps. Changed
+    # cells are gathered into tiles, neighbouring dirty tiles on a row merge
+    # into one rectangle and only those rectangles are sent to the display.
+    name = 'dirty'
+    tileSize = 16
+
+    def __init__(self, life):
+        super().__init__(life)
+        self.w, self.h = life.xborder + 1, life.yborder + 1
+        self.pixels = np.zeros((self.w, self.h, 3), dtype=np.uint8)
+        self.shown = np.zeros_like(self.pixels)
+        self.prevXs = np.zeros(0, dtype=np.int64)
+        self.prevYs = np.zeros(0, dtype=np.int64)
+        self.overlay = []
+        self.dirty = []
+        self.full = True
+
+    def clear(self):
+        pass
+
+    def invalidate(self):
+        self.full = True
+
+    def paint(self, x0, y0, x1, y1):
+        # blit cells [x0, x1) x [y0, y1) scaled up, returns the screen rect
+        scale = self.life.scale
+        tile = pygame.surfarray.make_surface(self.pixels[x0:x1, y0:y1])
+        if scale > 1:
+            tile = pygame.transform.scale(tile, ((x1 - x0) * scale, (y1 - y0) * scale))
+        return self.life.screen.blit(tile, (x0 * scale, y0 * scale))
+
+    def draw(self, xs, ys, clrs):
+        # last frame's cells go dark, this frame's take their colour
+        self.pixels[self.prevXs, self.prevYs] = 0
+        self.pixels[xs, ys] = clrs
+        cx = np.concatenate((self.prevXs, xs))
+        cy = np.concatenate((self.prevYs, ys))
+        self.prevXs, self.prevYs = xs, ys
+
+        if self.full:
+            self.full = False
+            self.life.screen.fill(self.life.BLACK)
+            self.dirty = [self.paint(0, 0, self.w, self.h)]
+            self.shown[:] = self.pixels
+            return
+
+        # the HUD covered part of the board last frame, put it back
+        scale = self.life.scale
+        self.dirty = []
+        for rect in self.overlay:
+            x0, y0 = rect.left // scale, rect.top // scale
+            x1, y1 = min(-(-rect.right // scale), self.w), min(-(-rect.bottom // scale), self.h)
+            self.dirty.append(self.life.screen.fill(self.life.BLACK, rect))
+            if x0 < x1 and y0 < y1:
+                self.dirty.append(self.paint(x0, y0, x1, y1))
+
+        changed = (self.pixels[cx, cy] != self.shown[cx, cy]).any(axis=1)
+        cx, cy = cx[changed], cy[changed]
+        self.shown[cx, cy] = self.pixels[cx, cy]
+        t = self.tileSize
+        tiles = np.zeros((-(-self.h // t), -(-self.w // t) + 1), dtype=bool)
+        tiles[cy // t, cx // t] = True
+
+        # runs of dirty tiles along each tile row
+        edges = np.diff(tiles.astype(np.int8), axis=1, prepend=0)
+        for row, start in zip(*np.nonzero(edges == 1)):
+            end = start + np.argmax(edges[row, start:] == -1)
+            self.dirty.append(self.paint(start * t, row * t, min(end * t, self.w), min(row * t + t, self.h)))
+
+    def present(self, overlay):
+        self.overlay = overlay
+        pygame.display.update(self.dirty + overlay)
+
+
+rendererList = {
+    RectRenderer.name: RectRenderer,
+    SurfRenderer.name: SurfRenderer,
+    DirtyRenderer.name: DirtyRenderer,
+}
+
+
+def makeRenderer(name, life):
+    if name not in rendererList:
+        print("unknown renderer '{}', using 'rect'".format(name))
+        name = RectRenderer.name
+    return rendererList[name](life)
@@ -0,0 +1,61 @@
+import numpy as np
+
+conway = 'B3/S23'
+
+
+class Rule:
+    # Life-like rule in B/S notation, e.g. B3/S23 (Conway), B36/S23 (HighLife)
+    # or B3678/S34678 (Day & Night). Compiled once into table[alive][count],
+    # True when a cell in that state with that many live neighbours is alive
+    # next generation.
+    def __init__(self, text=conway):
+        birth = survive = None
+        for part in text.strip().upper().split('/'):
+            if part[:1] == 'B' and birth is None:
+                birth = part[1:]
+            elif part[:1] == 'S' and survive is None:
+                survive = part[1:]
+            else:
+                raise ValueError("rule '{}' is not in B/S notation".format(text))
+        if birth is None or survive is None or not (birth + survive + '0').isdigit():
+            raise ValueError("rule '{}' is not in B/S notation".format(text))
+        if '9' in birth + survive:
+            raise ValueError("rule '{}' has a count above 8".format(text))
+        if '0' in birth:
+            # empty space would come alive everywhere, the unbounded engines can't step that
+            raise ValueError("rule '{}' with B0 is not supported".format(text))
+        self.birth = tuple(sorted(set(int(n) for n in birth)))
+        self.survive = tuple(sorted(set(int(n) for n in survive)))
+        self.table = (tuple(n in self.birth for n in range(9)),
+                      tuple(n in self.survive for n in range(9)))
+        self.text = 'B{}/S{}'.format(''.join(map(str, self.birth)), ''.join(map(str, self.survive)))
+
+    def isConway(self):
+        return self.text == conway
+
+    def apply(self, count, grid):
+        # next generation of a 0/1 grid from its neighbour counts, as the same
+        # few comparisons per cell the hard coded B3/S23 used
+        new = None
+        alive = None
+        for n in range(9):
+            b, s = self.table[0][n], self.table[1][n]
+            if not (b or s):
+                continue
+            term = count == n
+            if b != s:
+                if alive is None:
+                    alive = grid == 1
+                term &= alive if s else ~alive
+            new = term if new is None else new | term
+        if new is None:
+            return np.zeros(count.shape, dtype=bool)
+        return new
+
+
+def makeRule(text):
+    try:
+        return Rule(text)
+    except ValueError as e:
+        print("{}, using '{}'".format(e, conway))
+        return Rule(conway)
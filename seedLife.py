@@ -0,0 +1,102 @@
+import math
+import numpy as np
+
+
+def cells(xs, ys):
+    # float positions truncate like int() did, duplicates are left to the engine
+    return np.ravel(xs).astype(np.int64), np.ravel(ys).astype(np.int64)
+
+
+def randomCells(rng, cols, rows, popPercent, margin=0):
+    count = int(cols * rows * popPercent)
+    return rng.integers(margin, cols, count), rng.integers(margin, rows, count)
+
+
+def random(rng, cols, rows, popPercent, scale, margin=0):
+    return randomCells(rng, cols, rows, popPercent, margin)
+
+
+def circle(rng, cols, rows, popPercent, scale, margin=0):
+    # random cells kept inside two rings, left and right of centre
+    xs, ys = randomCells(rng, cols, rows, popPercent, margin)
+    outer = int(rows / 2) - 80 / scale
+    inner = int(rows / 2) - 240 / scale
+    keep = np.zeros(len(xs), dtype=bool)
+    for cx in (int(cols / 4), int(cols / 4) * 3):
+        hypotenuse = np.hypot(xs - cx, ys - int(rows / 2))
+        keep |= (hypotenuse <= outer) & (hypotenuse >= inner)
+    return xs[keep], ys[keep]
+
+
+def circleEdge(rng, cols, rows, popPercent, scale, margin=0):
+    # 40 circle outlines stepping right along the middle
+    it = 5000
+    # a running sum rather than arange * inc, so the angles round the same as adding inc in a loop
+    inc = (math.pi * 2) / it
+    angle = np.concatenate(([0.0], np.cumsum(np.full(it - 1, inc))))
+    radius = int(rows / 2 - 100)
+    cx = int(rows / 2) + 20 * np.arange(40)[:, None]
+    cy = int(rows / 2)
+    return cells(cx + radius * np.cos(angle), np.broadcast_to(cy + radius * np.sin(angle), (40, it)))
+
+
+def vertical(rng, cols, rows, popPercent, scale, margin=0):
+    lines = int(cols / 8) * np.array([1, 3, 5, 7])
+    ys = np.arange(int(rows))
+    return np.repeat(lines, len(ys)), np.tile(ys, len(lines))
+
+
+def horizontal(rng, cols, rows, popPercent, scale, margin=0):
+    lines = np.arange(32, int(rows), 64)
+    xs = np.arange(int(cols))
+    return np.tile(xs, len(lines)), np.repeat(lines, len(xs))
+
+
+def outlines(rects):
+    # outline of each (left, top, w, h), top and bottom w long from the left,
+    # left and right sides h long from the top
+    xs, ys = [], []
+    for left, top, w, h in rects:
+        across = np.arange(int(w))
+        down = np.arange(int(h))
+        xs += [left + across, left + across, np.full(len(down), left), np.full(len(down), left + w)]
+        ys += [np.full(len(across), top), np.full(len(across), top + h), top + down, top + down]
+    return cells(np.concatenate(xs), np.concatenate(ys))
+
+
+def rectangles(rng, cols, rows, popPercent, scale, margin=0):
+    margin = int(rows / 5)
+    w = int(cols / 2 - margin * 2)
+    right = cols / 2 + margin
+    return outlines([(margin, margin, w, margin), (margin, margin * 3, w, margin),
+                     (right, margin * 3, w, margin), (right, margin, w, margin)])
+
+
+def squares(rng, cols, rows, popPercent, scale, margin=0):
+    # two rows of six
+    margin = int(rows / 5)
+    return outlines([(margin / 2 + margin * 2 * i, top, margin, margin)
+                     for top in (margin, margin * 3) for i in range(6)])
+
+
+def whole(rng, cols, rows, popPercent, scale, margin=0):
+    return outlines([(int(cols / 2 - rows / 2), 0, int(rows), int(rows))])
+
+
+# seed styles, each builds x and y arrays of live cells for a cols x rows board
+styleList = {
+    'random': random,
+    'circle': circle,
+    'circleEdge': circleEdge,
+    'vertical': vertical,
+    'horizontal': horizontal,
+    'rectangles': rectangles,
+    'squares': squares,
+    'whole': whole,
+}
+
+
+def generate(style, cols, rows, popPercent, scale, margin=0, seed=None):
+    # x and y int64 arrays for one of styleList, seed fixes the random styles
+    rng = np.random.default_rng(seed)
+    return cells(*styleList[style](rng, cols, rows, popPercent, scale, margin))
@@ -8,9 +8,20 @@ from pygame_widgets.dropdown import Dropdown
 from pygame_widgets.button import Button
 import configparser
 import os
+import time
 import urllib.request
 
 
+fontPath = "C:\\Windows\\Fonts\\DejaVuSansMono.ttf"
+
+
+def loadFont(size):
+    # the bundled Windows font when there is one, else whatever mono font the system has
+    if os.path.exists(fontPath):
+        return pygame.font.Font(fontPath, size)
+    return pygame.font.SysFont('dejavusansmono,monospace', size)
+
+
 def github():
     webbrowser.open_new('https://github.com/mindware01/gameOfLifeNebula')
 
@@ -27,24 +38,48 @@ class Settings:
         else:
             self.screen = life.screen
 
+        # defaults first, so keys missing from an older settings.ini still resolve
         self.config = configparser.ConfigParser()
-        if os.path.exists("{}\\{}".format(os.getcwd(), 'settings.ini')):
+        self.config.add_section('life')
+        self.config['life']['scale'] = '2'
+        self.config['life']['poppercent'] = '0.06'
+        self.config['life']['fullscreen'] = 'True'
+        self.config['life']['screenwidth'] = '2000'
+        self.config['life']['screenheight'] = '500'
+        self.config['life']['style'] = 'random'
+        self.config['life']['showdebuginfo'] = 'False'
+        self.config['life']['patternfile'] = ''  # .rle, .cells or .mc pattern for the file style
+        self.config['life']['rule'] = 'B3/S23'  # B/S notation, e.g. B36/S23 HighLife, B3678/S34678 Day & Night
+        self.config['life']['topology'] = 'clipped'  # clipped, toroidal or unbounded (arrow keys pan)
+        self.config['life']['colorcap'] = '2000000'  # colour entries kept for an unbounded board
+        self.config['life']['engine'] = 'set'  # set, sparse, dense, bits, hashlife, incremental, tiled (Python 3.8+)
+        self.config['life']['workers'] = '0'  # tiled engine processes, 0 uses every core
+        self.config['life']['renderer'] = 'rect'  # rect, surfarray, dirty
+        self.config['life']['lookahead'] = '0'  # generations computed ahead on a worker thread, 0 runs in series
+        self.config['life']['fpscap'] = '0'  # frames per second, 0 runs flat out
+        self.config['life']['maxskip'] = '8'  # generations a capped frame may run undrawn to keep pace
+        self.config['life']['turbo'] = '1'  # generations per displayed frame, auto tunes it to hold turbofps
+        self.config['life']['turbofps'] = '30'
+        self.config['life']['brushsize'] = '4'  # cells across the drawing brush
+        self.config['life']['brushshape'] = 'square'  # square or circle
+        self.config['life']['checkpointinterval'] = '0'  # seconds between checkpoints of the run, 0 turns them off
+        self.config['life']['checkpointpath'] = 'life.ckpt'
+        self.config['life']['checkpointresume'] = 'False'  # carry on from the checkpoint when started
+        self.config['life']['metricswindow'] = '300'  # generations kept for the HUD percentiles
+        self.config['life']['metricsexport'] = ''  # per generation timings to a .csv or .jsonl file
+        self.config['life']['profileframes'] = '300'  # frames captured by cProfile after pressing P
+        self.config['life']['cycleperiod'] = '30'  # longest repeat detected, 0 turns cycle detection off
+        self.config['life']['autoreseed'] = 'False'  # start a new seed once the board repeats
+        self.config['life']['fastforward'] = '0'  # generations run before drawing, one hashlife jump if unbounded
+        self.config['life']['hashlifenodes'] = '1000000'  # hashlife node cache size before eviction
+        if os.path.exists(os.path.join(os.getcwd(), 'settings.ini')):
             self.config.read('settings.ini')
-        else:
-            self.config.add_section('life')
-            self.config['life']['scale'] = '2'
-            self.config['life']['poppercent'] = '0.06'
-            self.config['life']['fullscreen'] = 'True'
-            self.config['life']['screenwidth'] = '2000'
-            self.config['life']['screenheight'] = '500'
-            self.config['life']['style'] = 'random'
-            self.config['life']['showdebuginfo'] = 'False'
 
         self.screen.fill((0, 0, 0))
         pygame.display.flip()
 
         x, y, m, col, row = 40, 40, 10, 200, 40
-        self.font = pygame.font.Font("C:\\Windows\\Fonts\\DejaVuSansMono.ttf", 18)
+        self.font = loadFont(18)
         self.fontColor = (0, 255, 0)
         self.title1Label = self.font.render("Game of Life algorithm - John Horton Conway", True, self.fontColor)
         self.title1LabelPos = self.title1Label.get_rect(topleft=(x, y + m))
@@ -92,10 +127,16 @@ class Settings:
         self.styleLabelPos = self.scaleLabel.get_rect(topleft=(x, y + m))
 
         self.choiceList = ['random', 'circle', 'circleEdge', 'vertical', 'horizontal', 'rectangles', 'squares', 'whole',
-                           'drawn']
+                           'file', 'drawn']
         self.styleBox = Dropdown(self.screen, col, y, 120, 40, font=self.font, fontSize=32,
                                  name=self.config["life"]["style"], borderRadius=3,
-                                 choices=self.choiceList, values=[0, 1, 2, 3, 4, 5, 6, 7, 8])
+                                 choices=self.choiceList, values=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+
+        y += (row + m)
+        self.fileLabel = self.font.render("Pattern File", True, self.fontColor)
+        self.fileLabelPos = self.fileLabel.get_rect(topleft=(x, y + m))
+        self.fileBox = TextBox(self.screen, col, y, 300, 40, font=self.font, fontSize=20)
+        self.fileBox.setText(self.config["life"]["patternfile"])
 
         y += (row + m)
         self.debugLabel = self.font.render("Debug Info", True, self.fontColor)
@@ -119,6 +160,8 @@ class Settings:
                                 onClick=self.moreSettings)
 
         self.run = True
+        self.idleWait = 400  # ms, the text box cursor blink
+        self.activeWait = 1000 // 30
 
     def done(self):
         self.run = False
@@ -134,9 +177,17 @@ class Settings:
             self.moreButton.text = self.moreButton.font.render(self.moreButton.string, True, self.moreButton.textColour)
 
     def getSettings(self):
-
-        while self.run:
+        lastInput = 0
+        while self.run and not self.life.exitTrigger.is_set():
+            # sleep until there is input, waking for the text cursor blink and
+            # to notice exitTrigger; for a second after input keep polling
+            # quickly so held keys repeat in the text boxes
+            wait = self.activeWait if time.time() - lastInput < 1 else self.idleWait
+            event = pygame.event.wait(wait)
             events = pygame.event.get()
+            if event.type != pygame.NOEVENT:
+                events.insert(0, event)
+                lastInput = time.time()
             for event in events:
                 if event.type == pygame.QUIT:
                     pygame.quit()
@@ -154,6 +205,7 @@ class Settings:
             self.screen.blit(self.widthLabel, self.widthLabelPos)
             self.screen.blit(self.heightLabel, self.heightLabelPos)
             self.screen.blit(self.styleLabel, self.styleLabelPos)
+            self.screen.blit(self.fileLabel, self.fileLabelPos)
             self.screen.blit(self.debugLabel, self.debugLabelPos)
 
             if self.life.running is False:
@@ -177,6 +229,7 @@ class Settings:
         else:
             self.config['life']['style'] = self.choiceList[int(styleString)]
         self.config['life']['showdebuginfo'] = str(self.debugToggle.getValue())
+        self.config['life']['patternfile'] = self.fileBox.getText()
         with open('settings.ini', 'w') as configfile:
             self.config.write(configfile)
             configfile.close()
@@ -187,5 +240,6 @@ class Settings:
         pygame_widgets.WidgetHandler.removeWidget(self.widthBox)
         pygame_widgets.WidgetHandler.removeWidget(self.heightBox)
         pygame_widgets.WidgetHandler.removeWidget(self.styleBox)
+        pygame_widgets.WidgetHandler.removeWidget(self.fileBox)
         pygame_widgets.WidgetHandler.removeWidget(self.debugToggle)
         pygame_widgets.WidgetHandler.removeWidget(self.githubBtn)
@@ -0,0 +1,130 @@
+import numpy as np
+import colorLife
+
+
+def clamp(l, h, v):
+    if v < l:
+        return l
+    if v > h:
+        return h
+    return v
+
+
+class CellLife:
+    # the per cell colour object main.py used before the palette, kept as the
+    # reference the age table and ColorStore have to reproduce
+    def __init__(self):
+        self.clr = [70, 0, 0]
+        self.maxIntensity = 255
+        self.rState = 1
+        self.gState = 0
+        self.bState = 0
+
+        self.rStateUp = 1
+        self.rStateStay = 2
+        self.rStateFall = 3
+        self.rPeakVal = 255
+
+        self.gPeakVal = 150
+        self.gStateUp = 1
+        self.gStateFall = 3
+
+        self.bStateUp = 1
+        self.bPeak = 254
+        self.bStateFall = 3
+        self.bEndVal = 90
+
+        self.decayed = False
+
+    def decay(self):
+        if self.clr == [self.maxIntensity - 1, self.maxIntensity - 1, self.maxIntensity - 1]:  # last gasp flash
+            self.clr = [0, 0, self.bEndVal]
+            self.decayed = True
+        if self.decayed:
+            return True
+
+        decInc = 2
+
+        # RED
+        if self.rState == self.rStateUp:
+            if self.clr[0] < self.maxIntensity:
+                self.clr[0] += decInc
+            if self.clr[0] >= self.rPeakVal:
+                self.rState = self.rStateStay
+                self.gState = self.gStateUp
+        elif self.rState == self.rStateFall and self.clr[0] > 0:
+            self.clr[0] -= decInc
+            if self.clr[0] <= 0:
+                self.rState = 0
+                self.clr = [0, 0, 70]
+                self.bState = self.bStateUp
+
+        # GREEN
+        if self.gState == self.gStateUp:
+            if self.clr[1] < self.maxIntensity:
+                self.clr[1] += decInc
+            if self.clr[1] >= self.gPeakVal:
+                self.gState = self.gStateFall
+                self.rState = self.rStateFall
+        elif self.clr[1] > 0:
+            self.clr[1] -= decInc * 2
+
+        # BLUE
+        if self.bState == self.bStateUp:
+            if self.clr[2] < self.maxIntensity:
+                self.clr[2] += decInc
+            if self.clr[2] >= self.bPeak:
+                self.bState = self.bStateFall
+        elif self.bState == self.bStateFall:
+            self.clr[2] -= decInc
+            if self.clr[2] == self.bEndVal + decInc:
+                # flash before decayed completely
+                self.clr = [self.maxIntensity - 1, self.maxIntensity - 1, self.maxIntensity - 1]
+        self.clr[0] = clamp(0, self.maxIntensity, self.clr[0])
+        self.clr[1] = clamp(0, self.maxIntensity, self.clr[1])
+        self.clr[2] = clamp(0, self.maxIntensity, self.clr[2])
+
+        return self.decayed
+
+
+def test_palette_follows_cell_life():
+    table = colorLife.palette()
+    cell = CellLife()
+    for age in range(len(table) + 20):
+        assert tuple(table[min(age, len(table) - 1)].tolist()) == tuple(cell.clr), age
+        cell.decay()
+
+
+def test_color_store_matches_cell_lives():
+    # cells come alive on different frames and decay side by side, colours
+    # and the done count have to match the objects frame for frame
+    rng = np.random.default_rng(0)
+    shape = (12, 16)
+    store = colorLife.ColorStore(shape)
+    lives = dict()
+    xs = np.repeat(np.arange(shape[1]), shape[0])
+    ys = np.tile(np.arange(shape[0]), shape[1])
+    born = rng.integers(0, 120, len(xs))
+    frames = len(colorLife.palette()) + 150
+    for frame in range(frames):
+        alive = born <= frame
+        fx, fy = xs[alive], ys[alive]
+        for x, y in zip(fx.tolist(), fy.tolist()):
+            lives.setdefault((x, y), CellLife())
+        expected = np.array([lives[(x, y)].clr for x, y in zip(fx.tolist(), fy.tolist())], dtype=np.uint8)
+        assert (store.colors(fx, fy).reshape(-1, 3) == expected.reshape(-1, 3)).all(), frame
+
+        done = sum(lives[(x, y)].decay() for x, y in zip(fx.tolist(), fy.tolist()))
+        assert store.decayCells(fx, fy) == done, frame
+
+
+def test_decay_steps_match_single_frames():
+    # turbo ages cells several frames at once
+    xs, ys = np.arange(10), np.zeros(10, dtype=np.int64)
+    one = colorLife.ColorStore((1, 10))
+    many = colorLife.ColorStore((1, 10))
+    for frame in range(0, 600, 7):
+        for _ in range(7):
+            done = one.decayCells(xs, ys)
+        assert many.decayCells(xs, ys, 7) == done, frame
+        assert (one.age == many.age).all(), frame
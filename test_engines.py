@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+import engines
+import hashLife
+import ruleLife
+
+cols, rows = 40, 30
+generations = 12
+rules = ['B3/S23', 'B36/S23', 'B3/S012345678']
+
+
+class Life:
+    # the parts of Main an engine reads
+    def __init__(self, topology, rule):
+        self.cols, self.rows = cols, rows
+        self.xborder, self.yborder = cols, rows
+        self.topology = topology
+        self.rule = ruleLife.Rule(rule)
+        self.workers = 2
+        self.hashLifeNodes = 100000
+
+
+def seedArrays():
+    # a soup with cells past every border and a few repeated
+    rng = np.random.default_rng(7)
+    xs = rng.integers(-4, cols + 4, 500)
+    ys = rng.integers(-4, rows + 4, 500)
+    return xs, ys
+
+
+def run(name, topology, rule):
+    engine = engines.engineList[name](Life(topology, rule))
+    try:
+        board = engine.seed(*seedArrays())
+        boards = [set(board)]
+        for _ in range(generations):
+            board = engine.iterate(board)
+            boards.append(set(board))
+    finally:
+        engine.close()
+    return boards
+
+
+@pytest.mark.parametrize('rule', rules)
+@pytest.mark.parametrize('topology', engines.topologyList)
+def test_engines_match_set_engine(topology, rule):
+    expected = run('set', topology, rule)
+    assert len(expected[-1]) > 0
+    for name, engine in engines.engineList.items():
+        if topology not in engine.topologies or name == 'set':
+            continue
+        got = run(name, topology, rule)
+        for generation, (a, b) in enumerate(zip(got, expected)):
+            assert a == b, (name, generation)
+
+
+@pytest.mark.parametrize('rule', rules)
+def test_hashlife_jump_matches_single_steps(rule):
+    expected = run('set', 'unbounded', rule)[-1]
+    engine = engines.HashLifeEngine(Life('unbounded', rule))
+    board = engine.seed(*seedArrays())
+    assert engine.iterateMany(board, generations) == expected
+
+    start = set(zip(*(a.tolist() for a in seedArrays())))
+    assert hashLife.fastForward(start, generations, 100000, ruleLife.Rule(rule)) == expected
+
+
+def test_board_stands_in_for_a_set():
+    board = engines.Board(np.array([1, 2, 3]), np.array([0, 0, 5]))
+    cells = {(1, 0), (2, 0), (3, 5)}
+    assert len(board) == 3
+    assert board == cells
+    assert (2, 0) in board and (0, 2) not in board
+    assert board.union({(9, 9)}) == cells | {(9, 9)}
+    xs, ys = engines.boardArrays(cells)
+    assert set(zip(xs.tolist(), ys.tolist())) == cells
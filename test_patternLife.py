@@ -0,0 +1,64 @@
+import io
+import numpy as np
+import pytest
+import patternLife
+
+glider = {(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)}
+
+
+def cellSet(xs, ys):
+    return set(zip(xs.tolist(), ys.tolist()))
+
+
+def atOrigin(xs, ys):
+    return cellSet(*patternLife.sortedCells(zip(xs.tolist(), ys.tolist())))
+
+
+@pytest.mark.parametrize('ext, rule', [('rle', 'B36/S23'), ('cells', None), ('mc', 'B36/S23')])
+def test_save_then_load(tmp_path, ext, rule):
+    # plaintext has no rule, the others keep it. Cells come back moved to the
+    # origin, gaps and a long row exercise the run and line splitting
+    rng = np.random.default_rng(3)
+    cells = set(zip(rng.integers(-60, 300, 4000).tolist(), rng.integers(-20, 90, 4000).tolist()))
+    cells |= {(x, 100) for x in range(-60, 240)}
+    path = str(tmp_path / ('pattern.' + ext))
+    patternLife.save(path, cells, 'B36/S23')
+    xs, ys, loaded = patternLife.load(path)
+    assert loaded == rule
+    assert atOrigin(xs, ys) == cellSet(*patternLife.sortedCells(cells))
+
+
+def test_rle_glider():
+    text = "#N Glider\n#C a comment\nx = 3, y = 3, rule = B3/S23\nbo$2bo$3o!\n"
+    xs, ys, rule = patternLife.readRle(io.StringIO(text))
+    assert cellSet(xs, ys) == glider
+    assert rule == 'B3/S23'
+
+
+def test_rle_count_split_across_lines():
+    # 12o written as 1 at the end of one line and 2o at the start of the next
+    xs, ys, rule = patternLife.readRle(io.StringIO("x = 13, y = 2\nb1\n2o$o2\n$3o!\n"))
+    assert cellSet(xs, ys) == {(x, 0) for x in range(1, 13)} | {(0, 1)} | {(0, 3), (1, 3), (2, 3)}
+    assert rule is None
+
+
+def test_rle_without_header():
+    xs, ys, rule = patternLife.readRle(io.StringIO("bo$2bo$3o!"))
+    assert cellSet(xs, ys) == glider
+    assert rule is None
+
+
+def test_cells_file():
+    xs, ys, rule = patternLife.readCells(io.StringIO("!Name: Glider\n.O\n..O\nOOO\n"))
+    assert cellSet(xs, ys) == glider
+    assert rule is None
+
+
+def test_golly_macrocell():
+    # a glider leaf used twice by a level 4 node, top left and bottom right of
+    # its 16x16 square, under an empty level 5 root quadrant
+    text = "[M2] (golly 2.0)\n#R B36/S23\n.*$..*$***$\n4 1 0 0 1\n5 0 2 0 0\n"
+    xs, ys, rule = patternLife.readMacrocell(io.StringIO(text))
+    both = glider | {(x + 8, y + 8) for x, y in glider}
+    assert cellSet(xs, ys) == {(x + 16, y) for x, y in both}
+    assert rule == 'B36/S23'
@@ -0,0 +1,82 @@
+import math
+import numpy as np
+import pytest
+import seedLife
+
+sizes = [(960, 540, 2), (683, 384, 3)]
+
+
+def baseline(style, cols, rows):
+    # the cell by cell loops main.py seeded with before seedLife, kept as the
+    # reference the array versions have to reproduce
+    board = set()
+
+    def rectLife(leftR, topR, w, h):
+        for c in range(w):  # top line
+            board.add((leftR + c, topR))
+        for c in range(w):  # bottom line
+            board.add((leftR + c, topR + h))
+        for r in range(h):  # left line
+            board.add((leftR, topR + r))
+        for r in range(h):  # right line
+            board.add((leftR + w, topR + r))
+
+    if style == 'circleEdge':
+        for i in range(40):
+            center = int(rows / 2 + i * 20), int(rows / 2)
+            radius = int(rows / 2 - 100)
+            it = 5000
+            inc = (math.pi * 2) / it
+            angle = float(0)
+            for _ in range(it):
+                board.add((int(center[0] + (radius * math.cos(angle))), int(center[1] + (radius * math.sin(angle)))))
+                angle += inc
+    elif style == 'vertical':
+        for line in (1, 3, 5, 7):
+            for row in range(int(rows)):
+                board.add((int(cols / 8) * line, row))
+    elif style == 'horizontal':
+        for row in range(32, int(rows), 64):
+            for col in range(int(cols)):
+                board.add((col, row))
+    elif style == 'rectangles':
+        margin = int(rows / 5)
+        rW = int(cols / 2 - margin * 2)
+        rectLife(margin, margin, rW, margin)  # top left
+        rectLife(margin, margin * 3, rW, margin)  # bottom left
+        rectLife(cols / 2 + margin, margin * 3, rW, margin)  # bottom right
+        rectLife(cols / 2 + margin, margin, rW, margin)  # top right
+    elif style == 'squares':
+        margin = int(rows / 5)
+        for top in (margin, margin * 3):
+            for i in range(6):
+                rectLife(margin / 2 + margin * 2 * i, top, margin, margin)
+    elif style == 'whole':
+        rectLife(int(cols / 2 - rows / 2), 0, int(rows), int(rows))
+    return set((int(x), int(y)) for x, y in board)
+
+
+def cellSet(xs, ys):
+    return set(zip(xs.tolist(), ys.tolist()))
+
+
+@pytest.mark.parametrize('cols, rows, scale', sizes)
+@pytest.mark.parametrize('style', ['circleEdge', 'vertical', 'horizontal', 'rectangles', 'squares', 'whole'])
+def test_shapes_match_baseline(style, cols, rows, scale):
+    xs, ys = seedLife.generate(style, cols, rows, 0.06, scale)
+    assert xs.dtype == ys.dtype == np.int64
+    assert cellSet(xs, ys) == baseline(style, cols, rows)
+
+
+@pytest.mark.parametrize('cols, rows, scale', sizes)
+@pytest.mark.parametrize('style', ['random', 'circle'])
+def test_random_styles_repeat_and_stay_on_board(style, cols, rows, scale):
+    xs, ys = seedLife.generate(style, cols, rows, 0.06, scale, seed=42)
+    again = seedLife.generate(style, cols, rows, 0.06, scale, seed=42)
+    assert (xs == again[0]).all() and (ys == again[1]).all()
+    other = seedLife.generate(style, cols, rows, 0.06, scale, seed=43)
+    assert cellSet(xs, ys) != cellSet(*other)
+
+    assert len(xs) > 0
+    assert xs.min() >= 0 and xs.max() < cols
+    assert ys.min() >= 0 and ys.max() < rows